@@ -16,11 +16,83 @@ class Settings(BaseSettings):
     # Map DATABASE_URL from .env to this variable
     DATABASE_URL_OVERRIDE: str | None = Field(default=None, alias="DATABASE_URL")
 
+    # Opt-in async stack for the hot read routes.
+    # Needs an async driver installed: asyncpg (Postgres) or aiosqlite (SQLite), see the "async" extra.
+    DB_ASYNC: bool = False
+
+    # Connection pool, per worker process: keep workers * (size + overflow) under the DB's max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30 # Seconds to wait for a free connection before "QueuePool limit" errors
+    DB_POOL_RECYCLE: int = 1800 # Seconds; -1 keeps connections forever
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WAIT_LOG_MS: int = 100 # Log checkouts that waited longer than this
+    DB_STATEMENT_TIMEOUT_MS: int | None = None # Postgres only
+
+    # SQLite (local dev)
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12 # Stored hashes with a different cost are re-hashed on login
+    PASSWORD_HASH_WORKERS: int = max(1, min(4, os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING: int = 64 # Beyond this, logins get a 503 instead of piling up
+
+    # Authenticated user cache (per worker process)
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Let hot read paths build the user from the signed token claims (no cache, no DB).
+    # A deactivated user keeps read access on those paths until the token expires.
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    # System exercise catalog (shared by all users, cached per worker process)
+    SYSTEM_CATALOG_TTL_SECONDS: int = 300 # Bounds staleness when another process edits it
+
+    # Training calendar (/plans/calendar)
+    CALENDAR_MAX_DAYS: int = 400 # Widest range per request
+    CALENDAR_CACHE_SIZE: int = 1024 # Users whose expanded schedule is kept in memory
+    CALENDAR_CACHE_TTL_SECONDS: int = 3600
+
+    # Home screen (/dashboard)
+    STREAK_MAX_WEEKS: int = 104 # How far back the weekly streak is counted
+
+    # Batch reads (/batch)
+    BATCH_MAX_OPERATIONS: int = 10
+
+    # Exercise search (/exercises/search): prefix matches first, then fuzzy (trigram) ones
+    EXERCISE_SEARCH_LIMIT: int = 20
+    EXERCISE_SEARCH_MAX_LIMIT: int = 100
+    EXERCISE_SEARCH_MIN_SIMILARITY: float = 0.4 # Share of the query's trigrams found in the name
+
+    # History
+    HISTORY_PAGE_SIZE: int = 100
+    HISTORY_MAX_PAGE_SIZE: int = 500 # Hard cap per response, whatever the client asks for
+    SERIES_DEFAULT_POINTS: int = 200 # Exercise progress charts get downsampled to this
+    SERIES_MAX_POINTS: int = 1000
+
+    # Idempotency-Key header on writes
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
+    # Bulk import (/history/import, import_workouts.py)
+    IMPORT_CHUNK_SESSIONS: int = 500 # Sessions per bulk insert + commit
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    # Offline sync (/sync)
+    SYNC_CLOCK_SKEW_SECONDS: int = 30 # Re-send a little overlap: covers slow commits and server clock drift
+    SYNC_TOMBSTONE_TTL_DAYS: int = 90 # Older tokens get a full resync
+
+    # Progression (next-session targets on /workouts/start)
+    PROGRESSION_LOOKBACK_SESSIONS: int = 5 # Completed sessions of the routine to look at
+    PROGRESSION_DELOAD_AFTER_MISSES: int = 3 # Misses in a row at the same weight before a deload
+    PROGRESSION_DELOAD_PERCENT: float = 10
+    PROGRESSION_CACHE_SIZE: int = 1024
+    PROGRESSION_CACHE_TTL_SECONDS: int = 3600
+
     @property
     def DATABASE_URL(self) -> str:
         if self.DATABASE_URL_OVERRIDE:
@@ -31,6 +103,19 @@ class Settings(BaseSettings):
         
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        # Same database, async driver
+        url = self.DATABASE_URL
+        for sync_prefix, async_prefix in (
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix):]
+        return url
+
     # NEW CONFIGURATION
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_DIR, ".env"),
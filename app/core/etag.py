@@ -0,0 +1,31 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Conditional GET helpers:
+#   etag = make_etag("exercises", user_id, version)
+#   if etag_matches(request, etag): return not_modified(etag)
+#   response.headers.update(etag_headers(etag))
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+def etag_headers(etag: str) -> dict:
+    # private: per-user data; no-cache: clients must revalidate (cheap, it's a 304)
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
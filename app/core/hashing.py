@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class HashingPoolFull(Exception):
+    """Raised when too many hashing jobs are already waiting for a worker."""
+
+
+class HashingPool:
+    """
+    Dedicated, size-limited executor for bcrypt work.
+
+    bcrypt releases the GIL while it hashes, so a small thread pool scales with
+    cores, and a slow login no longer holds one of FastAPI's shared threadpool
+    slots that every sync route (history, workouts...) competes for.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0   # submitted and not finished yet (queued + running)
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so every uvicorn worker process gets its own threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="pwd-hash"
+            )
+        return self._executor
+
+    def _track(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HashingPoolFull()
+            self._pending += 1
+            executor = self._get_executor()
+
+        try:
+            future = executor.submit(self._track, fn, *args)
+            return await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "queued": max(0, self._pending - self._running),
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
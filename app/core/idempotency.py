@@ -0,0 +1,64 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.config import settings
+from app.db.models import IdempotencyKey
+
+# Flow for a write endpoint that accepts an Idempotency-Key header:
+#   1. get_stored_response() -> if it returns something, send it back as-is
+#   2. do the write, then remember_response() in the SAME transaction
+#   3. commit; on IntegrityError a concurrent retry won the race -> rollback
+#      and get_stored_response() again
+
+
+def _request_hash(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+def get_stored_response(
+    session: Session, user_id: uuid.UUID, key: Optional[str], endpoint: str, payload: BaseModel
+) -> Optional[dict]:
+    if not key:
+        return None
+
+    record = session.get(IdempotencyKey, (user_id, key))
+    if record is None or record.expires_at < datetime.utcnow():
+        return None
+
+    if record.endpoint != endpoint or record.request_hash != _request_hash(payload):
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return json.loads(record.response_body)
+
+def remember_response(
+    session: Session, user_id: uuid.UUID, key: Optional[str], endpoint: str,
+    payload: BaseModel, response: BaseModel
+):
+    if not key:
+        return
+
+    now = datetime.utcnow()
+    # Housekeeping: drop this user's expired keys (cheap, it's a PK prefix range)
+    session.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id)
+        .where(IdempotencyKey.expires_at < now)
+    )
+    session.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        endpoint=endpoint,
+        request_hash=_request_hash(payload),
+        response_body=response.model_dump_json(),
+        created_at=now,
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+    ))
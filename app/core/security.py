@@ -1,18 +1,32 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import uuid
 from jose import jwt
 from passlib.context import CryptContext
 from app.config import settings
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
+from sqlalchemy import event
 from jose import JWTError
-from app.db.database import get_session
+from app.db.database import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db.models import User
+from app.core.hashing import hashing_pool, HashingPoolFull
+from app.core.cache import TTLCache
 
 
 # 1. Password Hashing Setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max are pinned to the configured cost so passlib flags any stored hash
+# with a different cost as "needs update" (re-hashed on the next login).
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,6 +34,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    # Returns (is_valid, new_hash). new_hash is only set when the stored hash is outdated.
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# Async variants: run bcrypt on the dedicated hashing pool instead of the shared threadpool
+def _hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    try:
+        return await hashing_pool.run(get_password_hash, password)
+    except HashingPoolFull:
+        raise _hashing_busy_exception()
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    try:
+        return await hashing_pool.run(verify_and_update_password, plain_password, hashed_password)
+    except HashingPoolFull:
+        raise _hashing_busy_exception()
+
 # 2. JWT Token Setup
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -37,25 +75,94 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    session: Session = Depends(get_session)
-) -> User:
-    credentials_exception = HTTPException(
+def build_token_claims(user: User) -> dict:
+    # Extra claims let AUTH_TRUST_TOKEN_CLAIMS paths rebuild the user without a lookup
+    return {"sub": str(user.id), "email": user.email, "name": user.full_name}
+
+
+# 3. Authenticated User Cache
+# Keyed by user id. Holds detached copies, so they are safe to share across
+# requests/sessions; routes only read from current_user.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    # Any write to a user (deactivation, profile change, re-hash) drops it from this worker's cache
+    user_cache.invalidate(target.id)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    # Find user in DB
-    user = session.get(User, user_id)
+        user_id = uuid.UUID(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise _credentials_exception()
+    payload["sub"] = user_id
+    return payload
+
+def _check_active(user: User) -> User:
+    if not user.is_active:
+        raise _credentials_exception()
+    return user
+
+def _cache_user(db_user: Optional[User]) -> User:
+    if db_user is None:
+        raise _credentials_exception()
+    user = User(**db_user.model_dump())
+    user_cache.set(user.id, user)
+    return user
+
+def _user_from_claims(payload: dict) -> Optional[User]:
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and payload.get("email"):
+        return User(
+            id=payload["sub"],
+            email=payload["email"],
+            full_name=payload.get("name"),
+            hashed_password="",
+        )
+    return None
+
+async def _load_user(session: Session, user_id: uuid.UUID) -> User:
+    # Cache hits stay on the event loop; a miss is a sync DB read, so it goes
+    # to the threadpool instead of blocking every other request in the worker
+    user = user_cache.get(user_id)
+    if user is None:
+        # Find user in DB
+        user = _cache_user(await run_in_threadpool(session.get, User, user_id))
+    return _check_active(user)
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), 
+    session: Session = Depends(get_session)
+) -> User:
+    payload = _decode_token(token)
+    return await _load_user(session, payload["sub"])
+
+async def get_token_user(
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session)
+) -> User:
+    """
+    Auth for hot read paths. With AUTH_TRUST_TOKEN_CLAIMS on, the user is rebuilt
+    from the signed claims; otherwise (or for older tokens) same as get_current_user.
+    """
+    payload = _decode_token(token)
+    return _user_from_claims(payload) or await _load_user(session, payload["sub"])
+
+async def get_token_user_async(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    # get_token_user for the async routes (DB_ASYNC)
+    payload = _decode_token(token)
+    user = _user_from_claims(payload) or user_cache.get(payload["sub"])
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        user = _cache_user(await session.get(User, payload["sub"]))
+    return _check_active(user)
@@ -1,12 +1,173 @@
+import logging
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.util import queue as sqla_queue
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings # <--- Import settings
 
+logger = logging.getLogger(__name__)
+
+# --- Pool checkout timing ---
+# Two separate numbers, so the wait one can be used to size the pool:
+#   - wait: time blocked on the pool's queue for a free connection
+#   - connect: time opening a new DBAPI connection (network/TLS/auth), when below size
+class PoolWaitStats:
+    """How long requests waited for a pooled connection (per worker process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.slow_checkouts = 0
+        self.connects = 0
+        self.total_connect_ms = 0.0
+        self.max_connect_ms = 0.0
+
+    def record(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if wait_ms >= settings.DB_POOL_WAIT_LOG_MS:
+                self.slow_checkouts += 1
+        if wait_ms >= settings.DB_POOL_WAIT_LOG_MS:
+            logger.warning("Waited %.0f ms for a database connection", wait_ms)
+
+    def record_connect(self, connect_ms: float):
+        with self._lock:
+            self.connects += 1
+            self.total_connect_ms += connect_ms
+            self.max_connect_ms = max(self.max_connect_ms, connect_ms)
+        if connect_ms >= settings.DB_POOL_WAIT_LOG_MS:
+            logger.warning("Opening a new database connection took %.0f ms", connect_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "slow_checkouts": self.slow_checkouts,
+                "connects": self.connects,
+                "avg_connect_ms": round(self.total_connect_ms / self.connects, 2) if self.connects else 0.0,
+                "max_connect_ms": round(self.max_connect_ms, 2),
+            }
+
+pool_wait_stats = PoolWaitStats()
+
+def _timed_get(get, block: bool, timeout):
+    # Non-blocking gets that find the queue empty are not waits: the pool goes
+    # on to open a new connection (timed by _create_connection) or retries
+    start = time.perf_counter()
+    try:
+        item = get(block, timeout)
+    except sqla_queue.Empty:
+        if block:
+            pool_wait_stats.record((time.perf_counter() - start) * 1000) # Timed out waiting
+        raise
+    pool_wait_stats.record((time.perf_counter() - start) * 1000)
+    return item
+
+class TimedQueue(sqla_queue.Queue):
+    def get(self, block=True, timeout=None):
+        return _timed_get(super().get, block, timeout)
+
+class TimedAsyncQueue(sqla_queue.AsyncAdaptedQueue):
+    def get(self, block=True, timeout=None):
+        return _timed_get(super().get, block, timeout)
+
+class _TimedConnectMixin:
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            pool_wait_stats.record_connect((time.perf_counter() - start) * 1000)
+
+class TimedQueuePool(_TimedConnectMixin, QueuePool):
+    _queue_class = TimedQueue
+
+class TimedAsyncQueuePool(_TimedConnectMixin, AsyncAdaptedQueuePool):
+    _queue_class = TimedAsyncQueue
+
+# --- Engine options per backend ---
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    if url.startswith("sqlite") and ":memory:" in url:
+        # In-memory SQLite keeps its default single-connection pool
+        return {"connect_args": {"check_same_thread": False}} if not is_async else {}
+
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if url.startswith("sqlite"):
+        if not is_async:
+            # Sessions are used from FastAPI's threadpool, not the thread that opened them
+            options["connect_args"] = {"check_same_thread": False}
+    elif url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+    return options
+
+def _apply_sqlite_pragmas(sync_engine):
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL:
+            # Readers no longer block the writer (and vice versa)
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+
 # Use the URL from settings
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+_apply_sqlite_pragmas(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+
+def pool_stats() -> dict:
+    return {"status": engine.pool.status(), **pool_wait_stats.snapshot()}
+
+# --- Async stack (opt-in via DB_ASYNC) ---
+# Created lazily so the async driver is only needed when it's switched on.
+_async_engine = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = settings.ASYNC_DATABASE_URL
+        _async_engine = create_async_engine(url, **_engine_options(url, is_async=True))
+        _apply_sqlite_pragmas(_async_engine.sync_engine)
+    return _async_engine
+
+async def get_async_session():
+    async with AsyncSession(get_async_engine()) as session:
+        yield session
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
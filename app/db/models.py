@@ -1,9 +1,17 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import Index, text
+from datetime import datetime, date
 import uuid
 from pydantic import EmailStr 
 
+def updated_at_field():
+    # Set on insert and bumped by every UPDATE (ORM or bulk); /sync sends rows changed since a token
+    return Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"default": datetime.utcnow, "onupdate": datetime.utcnow},
+    )
+
 # --- 0. USERS (New) ---
 class User(SQLModel, table=True):
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
@@ -25,9 +33,14 @@ class ExerciseBase(SQLModel):
   
 
 class Exercise(ExerciseBase, table=True):
+    __table_args__ = (
+        Index("ix_exercise_user_id_updated_at", "user_id", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     is_custom: bool = True
-    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.id") 
+    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.id", index=True) 
+    updated_at: datetime = updated_at_field()
 
     
     # Relationships
@@ -36,6 +49,11 @@ class Exercise(ExerciseBase, table=True):
 
 # --- 2. THE PLAN (Macro Cycle) ---
 class WorkoutPlan(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_workoutplan_user_id_is_active", "user_id", "is_active"),
+        Index("ix_workoutplan_user_id_updated_at", "user_id", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str
     description: Optional[str] = None
@@ -49,13 +67,18 @@ class WorkoutPlan(SQLModel, table=True):
     
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = updated_at_field()
     
     routines: List["WorkoutRoutine"] = Relationship(back_populates="plan")
 
 # --- 3. THE ROUTINE (The Daily Template) ---
 class WorkoutRoutine(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_workoutroutine_updated_at", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
-    plan_id: uuid.UUID = Field(foreign_key="workoutplan.id")
+    plan_id: uuid.UUID = Field(foreign_key="workoutplan.id", index=True)
     name: str # e.g., "Pull Day A"
     
     # Scheduling Logic
@@ -63,6 +86,7 @@ class WorkoutRoutine(SQLModel, table=True):
     day_of_week: Optional[int] = None 
         # NEW FIELD
     routine_type: str = Field(default="workout") # Values: 'workout', 'rest'
+    updated_at: datetime = updated_at_field()
     
     plan: WorkoutPlan = Relationship(back_populates="routines")
     exercises: List["RoutineExercise"] = Relationship(back_populates="routine")
@@ -74,6 +98,11 @@ class RoutineExercise(SQLModel, table=True):
     Links an Exercise to a Routine with specific goals.
     Allows 'Deadlift' to be heavy on Mon and light on Fri.
     """
+    __table_args__ = (
+        Index("ix_routineexercise_routine_id_order_index", "routine_id", "order_index"),
+        Index("ix_routineexercise_updated_at", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     routine_id: uuid.UUID = Field(foreign_key="workoutroutine.id")
     exercise_id: uuid.UUID = Field(foreign_key="exercise.id")
@@ -88,12 +117,39 @@ class RoutineExercise(SQLModel, table=True):
     
     # Custom Increment for this specific routine
     increment_value: float 
+    updated_at: datetime = updated_at_field()
     
     routine: WorkoutRoutine = Relationship(back_populates="exercises")
     exercise: Exercise = Relationship(back_populates="routine_exercises")
 
 # --- 5. LOGGING: SESSIONS ---
+# Partial indexes below only cover completed sessions, which is what stats,
+# "last completed" and progress queries filter on.
+COMPLETED_ONLY = text("status = 'completed'")
+
 class WorkoutSession(SQLModel, table=True):
+    __table_args__ = (
+        # History list: user + date range, keyset on (start_time, id)
+        Index("ix_workoutsession_user_id_start_time", "user_id", "start_time", "id"),
+        # Stats / month counts
+        Index(
+            "ix_workoutsession_completed_user_id_start_time", "user_id", "start_time",
+            postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY,
+        ),
+        # Last workout
+        Index(
+            "ix_workoutsession_completed_user_id_end_time", "user_id", "end_time",
+            postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY,
+        ),
+        # Last completion per routine
+        Index(
+            "ix_workoutsession_completed_user_id_routine_id", "user_id", "routine_id", "end_time",
+            postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY,
+        ),
+        Index("ix_workoutsession_routine_id", "routine_id"),
+        Index("ix_workoutsession_user_id_updated_at", "user_id", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     routine_id: uuid.UUID = Field(foreign_key="workoutroutine.id")
     
@@ -104,9 +160,15 @@ class WorkoutSession(SQLModel, table=True):
     routine: WorkoutRoutine = Relationship(back_populates="sessions")
     sets: List["SessionSet"] = Relationship(back_populates="session")
     user_id: uuid.UUID = Field(foreign_key="user.id") # Sessions MUST have an owner
+    updated_at: datetime = updated_at_field()
 
 # --- 6. LOGGING: SETS ---
 class SessionSet(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_sessionset_session_id_exercise_id_set_number", "session_id", "exercise_id", "set_number"),
+        Index("ix_sessionset_updated_at", "updated_at"),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     session_id: uuid.UUID = Field(foreign_key="workoutsession.id")
     exercise_id: uuid.UUID = Field(foreign_key="exercise.id")
@@ -115,6 +177,84 @@ class SessionSet(SQLModel, table=True):
     reps: int
     weight: float
     is_completed: bool = False
+    updated_at: datetime = updated_at_field()
     
     session: WorkoutSession = Relationship(back_populates="sets")
-    exercise: Exercise = Relationship(back_populates="session_sets")
\ No newline at end of file
+    exercise: Exercise = Relationship(back_populates="session_sets")
+# --- 7. IDEMPOTENCY KEYS ---
+class IdempotencyKey(SQLModel, table=True):
+    """
+    Result of a write sent with an Idempotency-Key header.
+    A retry with the same key returns this instead of writing again.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    key: str = Field(primary_key=True, max_length=255)
+    endpoint: str
+    request_hash: str # Same key + different payload is a client bug, not a retry
+    response_body: str # JSON
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+# --- 8. AGGREGATES (maintained on write) ---
+class UserWorkoutStats(SQLModel, table=True):
+    """
+    Running totals of a user's completed sessions, updated in the same
+    transaction as the write, so GET /history/stats is a primary-key read.
+    Rebuild with rebuild_stats.py.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    total_workouts: int = 0
+    last_workout_date: Optional[datetime] = None
+
+class UserMonthlyWorkoutStats(SQLModel, table=True):
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    month: date = Field(primary_key=True) # First day of the month (by start_time, UTC)
+    workouts: int = 0
+
+class PersonalRecord(SQLModel, table=True):
+    """
+    Best marks per user and exercise (completed sets only), kept up to date
+    whenever sets are written, so PRs never need a scan of the history.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    exercise_id: uuid.UUID = Field(foreign_key="exercise.id", primary_key=True)
+
+    max_weight: float = 0.0
+    max_weight_reps: int = 0
+    max_weight_at: Optional[datetime] = None
+
+    # Estimated one-rep max, Epley: w * (1 + reps/30) / Brzycki: w * 36 / (37 - reps)
+    best_e1rm: float = 0.0
+    best_e1rm_brzycki: float = 0.0
+    best_e1rm_at: Optional[datetime] = None
+
+    best_set_volume: float = 0.0 # reps * weight
+    best_set_volume_at: Optional[datetime] = None
+
+class UserDataVersion(SQLModel, table=True):
+    """
+    Counter bumped whenever a user's exercises, plans, routines or targets
+    change. Conditional GETs derive their ETag from it, so a 304 costs one
+    primary-key read instead of the full query.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    version: int = 0
+    # Bumped by edits to logged sessions only; versions what's derived from history
+    # (cached prescriptions) without invalidating the ETags/caches keyed on `version`
+    history_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+# --- 9. SYNC ---
+class DeletedRecord(SQLModel, table=True):
+    """
+    Tombstone for a deleted row of a synced table, so /sync can tell
+    clients to drop their copy. Kept for SYNC_TOMBSTONE_TTL_DAYS.
+    """
+    __table_args__ = (
+        Index("ix_deletedrecord_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="user.id")
+    table_name: str
+    record_id: uuid.UUID
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,41 @@
+from sqlalchemy import Date, cast, func, type_coerce
+from sqlmodel import Session
+
+# Small helpers for the few places where Postgres and SQLite need different SQL.
+
+
+def dialect_insert(session: Session, model):
+    """
+    INSERT for the session's backend, with .on_conflict_do_update() / .excluded
+    available (both Postgres and SQLite support ON CONFLICT upserts).
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+
+def date_bucket(session: Session, column, period: str):
+    """
+    Truncate a timestamp column to the start of its day / week (Monday) / month,
+    in SQL, returned as a date.
+    """
+    if period not in ("day", "week", "month"):
+        raise ValueError(f"Unknown period: {period}")
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return cast(func.date_trunc(period, column), Date)
+    if dialect == "sqlite":
+        modifiers = {
+            "day": (),
+            # 'weekday 0' jumps forward to Sunday (or stays), -6 days lands on Monday
+            "week": ("weekday 0", "-6 days"),
+            "month": ("start of month",),
+        }[period]
+        return type_coerce(func.date(column, *modifiers), Date)
+    raise NotImplementedError(f"Date bucketing is not supported on {dialect}")
@@ -1,7 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.db.database import create_db_and_tables
-from app.routers import exercises, workouts, history, plans, auth
+from fastapi.routing import APIRoute
+from app.config import settings
+from app.db.database import create_db_and_tables, get_async_engine, dispose_async_engine, pool_stats
+from app.routers import exercises, workouts, history, plans, auth, async_reads, sync, batch, dashboard
+from app.core.hashing import hashing_pool
+from app.core.security import user_cache
+from app.services.progression import prescription_cache
+from app.services.catalog import system_catalog_cache
+from app.services.calendar import calendar_cache
 # We import models here so SQLModel "knows" they exist before creating tables
 from app.db import models 
 
@@ -12,24 +19,63 @@ async def lifespan(app: FastAPI):
     # This runs before the app starts accepting requests
     create_db_and_tables()
     print("✅ Database tables verified/created.")
+    if settings.DB_ASYNC:
+        # Build the async engine now so a missing driver fails startup, not the first request
+        try:
+            get_async_engine()
+        except ImportError as e:
+            raise RuntimeError(
+                f"DB_ASYNC is on but the async driver is missing ({e.name}): install gym-backend[async]"
+            ) from e
+        print("✅ Async database engine ready.")
     
     yield # The app runs while execution pauses here
     
     # --- SHUTDOWN LOGIC ---
     # This runs when you press Ctrl+C
+    hashing_pool.shutdown()
+    await dispose_async_engine()
     print("🛑 Shutting down Gym Tracker API...")
 
 # Initialize FastAPI with the lifespan
 app = FastAPI(lifespan=lifespan)
 
 # Register Routers
+if settings.DB_ASYNC:
+    # Must come first: same paths as the sync routes, first match wins
+    app.include_router(async_reads.router)
 app.include_router(auth.router)
 app.include_router(exercises.router)
 app.include_router(workouts.router)
 app.include_router(history.router)
 app.include_router(plans.router)
+app.include_router(sync.router)
+app.include_router(batch.router)
+app.include_router(dashboard.router)
+
+if settings.DB_ASYNC:
+    # The sync routes shadowed by async_reads can never be reached: keep them out of the schema
+    shadowed = {(route.path, method) for route in async_reads.router.routes for method in route.methods}
+    for route in app.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.endpoint.__module__ != async_reads.__name__
+            and any((route.path, method) in shadowed for method in route.methods)
+        ):
+            route.include_in_schema = False
 
 
 @app.get("/")
 def root():
-    return {"message": "Gym Tracker API is running"}
\ No newline at end of file
+    return {"message": "Gym Tracker API is running"}
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "password_hashing": hashing_pool.stats(),
+        "user_cache": user_cache.stats(),
+        "prescription_cache": prescription_cache.stats(),
+        "system_catalog_cache": system_catalog_cache.stats(),
+        "calendar_cache": calendar_cache.stats(),
+        "db_pool": pool_stats(),
+    }
\ No newline at end of file
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from app.config import settings
+from app.db.database import get_async_session
+from app.db.models import User
+from app.core.security import get_token_user_async
+from app.schemas.exercise import ExerciseRead
+from app.schemas.plan import PlanRead
+from app.schemas.workout import WorkoutRoutineRead
+from app.core.etag import etag_matches, etag_headers, not_modified
+from app.routers.exercises import catalog_etag
+from app.services.catalog import get_system_catalog_async, custom_catalog_statement, render_catalog
+from app.services.versions import data_version_statement
+from app.routers.history import SessionSummary, history_page_statement, history_page_response
+from app.routers.plans import active_plans_statement
+from app.routers.workouts import routines_statement, routines_response
+
+# Async versions of the hot read routes, mounted ahead of the sync routers when
+# DB_ASYNC is on (same paths, so these win). They reuse the sync routers'
+# statements, so the two stacks can't drift apart in what they return.
+router = APIRouter(tags=["async"])
+
+@router.get("/exercises/", response_model=List[ExerciseRead])
+async def read_exercises(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_token_user_async)
+):
+    system_digest, system_entries = await get_system_catalog_async(session)
+    version = (await session.exec(data_version_statement(current_user.id))).first() or 0
+    etag = catalog_etag(current_user.id, version, system_digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    custom = (await session.exec(custom_catalog_statement(current_user.id))).all()
+    return Response(
+        content=render_catalog(system_entries, custom),
+        media_type="application/json",
+        headers=etag_headers(etag),
+    )
+
+@router.get("/history/", response_model=List[SessionSummary])
+async def get_history(
+    start_date: datetime,
+    end_date: datetime,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_token_user_async)
+):
+    statement = history_page_statement(current_user.id, start_date, end_date, limit, cursor)
+    rows = (await session.exec(statement)).all()
+    return history_page_response(rows, limit, request, response)
+
+@router.get("/plans/", response_model=List[PlanRead])
+async def get_plans(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_token_user_async)
+):
+    return (await session.exec(active_plans_statement(current_user.id))).all()
+
+@router.get("/workouts/routines", response_model=List[WorkoutRoutineRead])
+async def get_routines(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_token_user_async)
+):
+    rows = (await session.exec(routines_statement(current_user.id))).all()
+    return routines_response(rows)
@@ -1,51 +1,68 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
-from typing import Annotated
+from typing import Annotated, Optional
 
 from app.db.database import get_session
 from app.db.models import User
 from app.schemas.user import UserCreate, UserRead, Token
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_and_update_password_async, create_access_token, build_token_claims
 
 router = APIRouter(tags=["auth"])
 
+# These routes are async so bcrypt can be awaited on the hashing pool without
+# holding a threadpool slot. The Session is sync, so every DB call goes through
+# run_in_threadpool: a slow query or a pool checkout wait must not stall the loop.
+
+def _find_user(session: Session, email: str) -> Optional[User]:
+    return session.exec(select(User).where(User.email == email)).first()
+
+def _save_user(session: Session, user: User) -> User:
+    session.add(user)
+    session.commit()
+    session.refresh(user) # Loaded here, so reading it afterwards doesn't hit the DB on the loop
+    return user
+
 @router.post("/register", response_model=UserRead)
-def register(user_data: UserCreate, session: Session = Depends(get_session)):
+async def register(user_data: UserCreate, session: Session = Depends(get_session)):
     # 1. Check if email exists
-    statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = await run_in_threadpool(_find_user, session, user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # 2. Hash Password & Save
     new_user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         full_name=user_data.full_name
     )
-    session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
-    return new_user
+    return await run_in_threadpool(_save_user, session, new_user)
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Session = Depends(get_session)
 ):
     # 1. Find User
-    statement = select(User).where(User.email == form_data.username)
-    user = session.exec(statement).first()
+    user = await run_in_threadpool(_find_user, session, form_data.username)
     
     # 2. Verify Password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # 3. Upgrade the stored hash if it was made with a different bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+        user = await run_in_threadpool(_save_user, session, user)
     
-    # 3. Generate Token
-    access_token = create_access_token(data={"sub": str(user.id)})
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    # 4. Generate Token
+    access_token = create_access_token(data=build_token_claims(user))
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,102 @@
+import json
+import logging
+from typing import Callable, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session
+
+from app.config import settings
+from app.db.database import get_session
+from app.db.models import User
+from app.core.security import get_token_user
+from app.schemas.analytics import PersonalRecordRead
+from app.schemas.dashboard import Dashboard
+from app.schemas.plan import PlanRead
+from app.schemas.workout import WorkoutRoutineRead
+from app.services.catalog import get_system_catalog, custom_catalog_statement, render_catalog
+from app.routers import dashboard, history, plans, workouts
+
+logger = logging.getLogger(__name__)
+
+# Several read endpoints in one round trip: one token check, one user lookup,
+# one pooled connection. Only the reads registered below can be batched; each
+# one calls the same code as its own route and is serialized with the same
+# response model.
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# path -> fn(session, user) returning the JSON body
+BatchOperation = Callable[[Session, User], bytes]
+BATCH_OPERATIONS: dict[str, BatchOperation] = {}
+
+def batchable(path: str, response_model=None):
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def register(fn):
+        if adapter is None:
+            BATCH_OPERATIONS[path] = fn # Already returns JSON bytes
+        else:
+            BATCH_OPERATIONS[path] = lambda session, user: adapter.dump_json(fn(session, user))
+        return fn
+    return register
+
+
+@batchable("/workouts/routines", List[WorkoutRoutineRead])
+def _routines(session: Session, user: User):
+    return workouts.get_routines(session=session, current_user=user)
+
+@batchable("/history/stats", history.UserStats)
+def _stats(session: Session, user: User):
+    return history.get_stats(session=session, current_user=user)
+
+@batchable("/history/records", List[PersonalRecordRead])
+def _records(session: Session, user: User):
+    return history.get_records(session=session, current_user=user)
+
+@batchable("/plans/", List[PlanRead])
+def _plans(session: Session, user: User):
+    return plans.get_plans(session=session, current_user=user)
+
+@batchable("/dashboard", Dashboard)
+def _dashboard(session: Session, user: User):
+    return dashboard.get_dashboard(today=None, session=session, current_user=user)
+
+@batchable("/exercises/")
+def _exercises(session: Session, user: User) -> bytes:
+    # Same cached system catalog + custom rows as GET /exercises/ (no ETag inside a batch)
+    _, system_entries = get_system_catalog(session)
+    return render_catalog(system_entries, session.exec(custom_catalog_statement(user.id)).all())
+
+
+def _result(status: int, body: bytes) -> bytes:
+    return b'{"status":' + str(status).encode() + b',"body":' + body + b"}"
+
+@router.get("")
+def batch(
+    op: List[str] = Query(min_length=1, max_length=settings.BATCH_MAX_OPERATIONS),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    """
+    GET /batch?op=/workouts/routines&op=/history/stats&op=/plans/&op=/exercises/
+
+    Returns {"<op>": {"status": 200, "body": <same JSON as the route>}, ...}.
+    Operations fail independently (their own status + {"detail": ...}).
+    """
+    results = []
+    for path in dict.fromkeys(op): # Dedupe, keep order
+        fn = BATCH_OPERATIONS.get(path)
+        if fn is None:
+            status, body = 404, json.dumps({"detail": f"Not batchable: {path}"}).encode()
+        else:
+            try:
+                status, body = 200, fn(session, current_user)
+            except HTTPException as e:
+                status, body = e.status_code, json.dumps({"detail": e.detail}).encode()
+            except Exception:
+                logger.exception("Batch operation %s failed", path)
+                session.rollback() # Keep the connection usable for the next operation
+                status, body = 500, b'{"detail":"Internal Server Error"}'
+        results.append(json.dumps(path).encode() + b":" + _result(status, body))
+
+    return Response(content=b"{" + b",".join(results) + b"}", media_type="application/json")
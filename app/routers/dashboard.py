@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import Optional
+from datetime import date, datetime, timedelta
+
+from app.config import settings
+from app.db.database import get_session
+from app.db.models import User, WorkoutPlan, WorkoutRoutine, WorkoutSession
+from app.core.security import get_token_user
+from app.db.sql import date_bucket
+from app.schemas.dashboard import Dashboard, DashboardRoutine
+from app.services.stats import get_user_stats
+from app.routers.workouts import last_completed_subquery
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+def build_dashboard(session: Session, user_id, today: date) -> Dashboard:
+    week_start = today - timedelta(days=today.weekday())
+    week_start_at = datetime.combine(week_start, datetime.min.time())
+    week_end_at = week_start_at + timedelta(days=7)
+
+    # 1. Routines of the active plan(s) running this week, with their last completion
+    last_completed = last_completed_subquery(user_id)
+    routine_rows = session.exec(
+        select(
+            WorkoutRoutine.id, WorkoutRoutine.name, WorkoutRoutine.routine_type, WorkoutRoutine.day_of_week,
+            WorkoutPlan.start_date, WorkoutPlan.end_date, last_completed.c.last_completed_at,
+        )
+        .join(WorkoutPlan)
+        .outerjoin(last_completed, last_completed.c.routine_id == WorkoutRoutine.id)
+        .where(WorkoutPlan.user_id == user_id)
+        .where(WorkoutPlan.is_active == True)
+        .where(WorkoutPlan.start_date < week_end_at)
+        .where(WorkoutPlan.end_date > week_start_at)
+    ).all()
+
+    # 2. Totals (pre-aggregated, PK read)
+    total, month_count, last_workout_date = get_user_stats(session, user_id, today.replace(day=1))
+
+    # 3. Completed sessions per week, newest first: this week's count + the streak
+    week = date_bucket(session, WorkoutSession.start_time, "week").label("week")
+    week_rows = session.exec(
+        select(week, func.count())
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .where(WorkoutSession.start_time >= week_start_at - timedelta(weeks=settings.STREAK_MAX_WEEKS))
+        .where(WorkoutSession.start_time < week_end_at)
+        .group_by(week)
+        .order_by(week.desc())
+    ).all()
+    per_week = {week_date: count for week_date, count in week_rows}
+
+    streak, expected = 0, week_start
+    if expected not in per_week:
+        expected -= timedelta(weeks=1) # This week isn't lost yet
+    while expected in per_week:
+        streak += 1
+        expected -= timedelta(weeks=1)
+
+    this_week, floating = [], []
+    for routine_id, name, routine_type, day_of_week, plan_start, plan_end, last_completed_at in routine_rows:
+        routine = DashboardRoutine(
+            id=routine_id,
+            name=name,
+            routine_type=routine_type,
+            day_of_week=day_of_week,
+            last_completed_at=last_completed_at,
+            done_this_week=last_completed_at is not None and last_completed_at >= week_start_at,
+        )
+        if day_of_week is None:
+            floating.append(routine)
+            continue
+        routine.scheduled_for = week_start + timedelta(days=day_of_week)
+        if plan_start.date() <= routine.scheduled_for < plan_end.date(): # Plans run [start, end)
+            this_week.append(routine)
+    this_week.sort(key=lambda r: (r.day_of_week, r.name))
+    floating.sort(key=lambda r: r.name)
+
+    return Dashboard(
+        week_start=week_start,
+        this_week=this_week,
+        floating=floating,
+        workouts_this_week=per_week.get(week_start, 0),
+        workouts_this_month=month_count,
+        total_workouts=total,
+        last_workout_date=last_workout_date,
+        streak_weeks=streak,
+    )
+
+@router.get("", response_model=Dashboard)
+def get_dashboard(
+    today: Optional[date] = None, # The client's local date; defaults to today in UTC
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # Everything the home screen shows, in 3 queries
+    return build_dashboard(session, current_user.id, today or datetime.utcnow().date())
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
 from typing import List
 import uuid
 
 from app.db.database import get_session
 from app.db.models import Exercise, User
 from app.schemas.exercise import ExerciseCreate, ExerciseRead, ExerciseUpdate
-from app.core.security import get_current_user # Import the Gatekeeper
+from app.core.security import get_current_user, get_token_user # Import the Gatekeeper
+from app.core.etag import make_etag, etag_matches, etag_headers, not_modified
+from app.services.versions import get_data_version, bump_data_version
+from app.services.sync import record_deletion
+from app.services.catalog import get_system_catalog, custom_catalog_statement, render_catalog, search_exercises
+from app.config import settings
 
 router = APIRouter(prefix="/exercises", tags=["exercises"])
 
@@ -22,23 +27,52 @@ def create_exercise(
     db_exercise.is_custom = True
     
     session.add(db_exercise)
+    bump_data_version(session, current_user.id)
     session.commit()
     session.refresh(db_exercise)
     return db_exercise
 
+def catalog_etag(user_id: uuid.UUID, version: int, system_digest: str) -> str:
+    return make_etag("exercises", user_id, version, system_digest)
+
 @router.get("/", response_model=List[ExerciseRead])
 def read_exercises(
+    request: Request,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_token_user)
 ):
-    # Logic: Show System Exercises OR My Custom Exercises
-    statement = select(Exercise).where(
-        or_(
-            Exercise.user_id == None,       # System
-            Exercise.user_id == current_user.id # Mine
-        )
+    # Logic: Show System Exercises (cached, shared) + My Custom Exercises (queried)
+    system_digest, system_entries = get_system_catalog(session)
+
+    # Unchanged since the client's copy? 304 after a PK read, no catalog query
+    etag = catalog_etag(current_user.id, get_data_version(session, current_user.id), system_digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    custom = session.exec(custom_catalog_statement(current_user.id)).all()
+    return Response(
+        content=render_catalog(system_entries, custom),
+        media_type="application/json",
+        headers=etag_headers(etag),
+    )
+
+@router.get("/search", response_model=List[ExerciseRead])
+def search_exercise_catalog(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=settings.EXERCISE_SEARCH_LIMIT, ge=1, le=settings.EXERCISE_SEARCH_MAX_LIMIT),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # Blank after stripping would match the whole catalog on both backends
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="Search query must not be blank")
+
+    # System + my exercises, prefix matches first, then fuzzy ones (typos, words inside the name)
+    return Response(
+        content=search_exercises(session, current_user.id, q, limit),
+        media_type="application/json",
     )
-    return session.exec(statement).all()
 
 @router.delete("/{exercise_id}")
 def delete_exercise(
@@ -55,6 +89,8 @@ def delete_exercise(
         raise HTTPException(status_code=403, detail="Not authorized to delete this exercise")
         
     session.delete(exercise)
+    record_deletion(session, current_user.id, Exercise, [exercise_id])
+    bump_data_version(session, current_user.id)
     session.commit()
     return {"ok": True}
 
@@ -77,6 +113,7 @@ def update_exercise(
         setattr(db_exercise, key, value)
         
     session.add(db_exercise)
+    bump_data_version(session, current_user.id)
     session.commit()
     session.refresh(db_exercise)
     return db_exercise
\ No newline at end of file
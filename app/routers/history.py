@@ -1,14 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, Header, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import func, or_, and_, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Literal
+from datetime import datetime, timedelta
+import base64
+import io
 import uuid
 from pydantic import BaseModel
 
+from app.config import settings
 from app.db.database import get_session
-from app.db.models import WorkoutSession, WorkoutRoutine, User
-from app.core.security import get_current_user # <--- Auth
+from app.db.models import WorkoutSession, WorkoutRoutine, User, PersonalRecord
+from app.core.security import get_current_user, get_token_user # <--- Auth
+from app.core.idempotency import get_stored_response, remember_response
+from app.services.stats import get_user_stats, month_of
+from app.schemas.analytics import TrainingAnalytics, VolumeBucket, ExerciseTonnage, PersonalRecordRead, ExerciseSeries, SeriesPoint
+from app.services.records import recompute_records, epley_sql
+from app.services.sync import record_deletion
+from app.services.versions import bump_history_version
+from app.services.export import iter_sessions, ndjson_chunks, csv_chunks
+from app.services.importer import parse_csv, parse_ndjson, import_sessions
+from app.schemas.export import ImportReport
+from app.db.sql import date_bucket
 
 
 from app.db.models import SessionSet, Exercise # Ensure these are imported
@@ -30,72 +45,283 @@ class UserStats(BaseModel):
 
 router = APIRouter(prefix="/history", tags=["history"])
 
-@router.get("/", response_model=List[SessionSummary])
-def get_history(
-    start_date: datetime,
-    end_date: datetime,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user) # <--- Auth
+# Keyset pagination: the cursor is the (start_time, id) of the last row sent,
+# so every page is an index range scan no matter how deep the client scrolls.
+def encode_history_cursor(start_time: datetime, session_id: uuid.UUID) -> str:
+    raw = f"{start_time.isoformat()}|{session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        start_time, session_id = raw.split("|")
+        return datetime.fromisoformat(start_time), uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def history_page_statement(
+    user_id: uuid.UUID, start_date: datetime, end_date: datetime, limit: int, cursor: Optional[str]
 ):
+    # Only the columns the summary needs, newest first, one extra row to detect a next page
     statement = (
-        select(WorkoutSession, WorkoutRoutine.name)
+        select(WorkoutSession.id, WorkoutRoutine.name, WorkoutSession.start_time, WorkoutSession.status)
         .join(WorkoutRoutine)
-        .where(WorkoutSession.user_id == current_user.id) # <--- Filter
+        .where(WorkoutSession.user_id == user_id) # <--- Filter
         .where(WorkoutSession.start_time >= start_date)
         .where(WorkoutSession.start_time <= end_date)
-        .order_by(WorkoutSession.start_time.desc())
+        .order_by(WorkoutSession.start_time.desc(), WorkoutSession.id.desc())
+        .limit(limit + 1)
     )
-    
-    results = session.exec(statement).all()
-    
-    history = []
-    for workout, routine_name in results:
-        history.append(SessionSummary(
-            id=workout.id,
-            routine_name=routine_name,
-            date=workout.start_time,
-            status=workout.status
+    if cursor:
+        after_time, after_id = decode_history_cursor(cursor)
+        statement = statement.where(or_(
+            WorkoutSession.start_time < after_time,
+            and_(WorkoutSession.start_time == after_time, WorkoutSession.id < after_id)
         ))
-    return history
+    return statement
+
+def history_page_response(rows, limit: int, request: Request, response: Response) -> List[SessionSummary]:
+    # If there are more rows than `limit`, the page is truncated: the next page's cursor goes in
+    # the X-Next-Cursor header, and the full next-page URL in a standard Link: rel="next" header
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id, _, last_start, _ = rows[-1]
+        next_cursor = encode_history_cursor(last_start, last_id)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    
+    return [
+        SessionSummary(id=session_id, routine_name=routine_name, date=start_time, status=status)
+        for session_id, routine_name, start_time, status in rows
+    ]
+
+@router.get("/", response_model=List[SessionSummary])
+def get_history(
+    start_date: datetime,
+    end_date: datetime,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user) # <--- Auth
+):
+    """
+    Sessions in the range, newest first, at most `limit` (default HISTORY_PAGE_SIZE) per page.
+    A truncated page carries X-Next-Cursor and Link: rel="next"; clients that want the whole
+    range must follow them.
+    """
+    statement = history_page_statement(current_user.id, start_date, end_date, limit, cursor)
+    rows = session.exec(statement).all()
+    return history_page_response(rows, limit, request, response)
 
 @router.get("/stats", response_model=UserStats)
 def get_stats(
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user) # <--- Auth
+    current_user: User = Depends(get_token_user) # <--- Auth
 ):
-    now = datetime.utcnow()
-    start_of_month = datetime(now.year, now.month, 1)
+    # Pre-aggregated on write (see app/services/stats.py), so this is a primary-key read
+    total, month_count, last_workout_date = get_user_stats(
+        session, current_user.id, month_of(datetime.utcnow())
+    )
 
-    # Base query for THIS user
-    base_query = select(func.count(WorkoutSession.id)).where(WorkoutSession.user_id == current_user.id).where(WorkoutSession.status == "completed")
+    return UserStats(
+        total_workouts=total,
+        workouts_this_month=month_count,
+        last_workout_date=last_workout_date
+    )
 
-    total = session.exec(base_query).one()
-    
-    month_count = session.exec(
-        base_query.where(WorkoutSession.start_time >= start_of_month)
-    ).one()
-    
-    last_workout = session.exec(
-        select(WorkoutSession)
+
+
+@router.get("/analytics", response_model=TrainingAnalytics)
+def get_analytics(
+    period: Literal["week", "month"] = "week",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # Defaults to the last year. All grouping (incl. the date buckets) happens in SQL.
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or end_date - timedelta(days=365)
+
+    in_range = and_(
+        WorkoutSession.user_id == current_user.id,
+        WorkoutSession.status == "completed",
+        WorkoutSession.start_time >= start_date,
+        WorkoutSession.start_time <= end_date,
+    )
+    set_volume = SessionSet.reps * SessionSet.weight
+
+    # 1. Volume per week/month (sessions without completed sets still count as sessions)
+    bucket = date_bucket(session, WorkoutSession.start_time, period).label("bucket")
+    bucket_rows = session.exec(
+        select(
+            bucket,
+            func.count(func.distinct(WorkoutSession.id)),
+            func.count(SessionSet.id),
+            func.coalesce(func.sum(set_volume), 0.0),
+        )
+        .select_from(WorkoutSession)
+        .outerjoin(SessionSet, and_(SessionSet.session_id == WorkoutSession.id, SessionSet.is_completed == True))
+        .where(in_range)
+        .group_by(bucket)
+        .order_by(bucket)
+    ).all()
+
+    # 2. Tonnage per exercise over the whole range
+    exercise_rows = session.exec(
+        select(
+            SessionSet.exercise_id,
+            Exercise.name,
+            func.count(SessionSet.id),
+            func.sum(SessionSet.reps),
+            func.sum(set_volume).label("tonnage"),
+        )
+        .join(WorkoutSession, SessionSet.session_id == WorkoutSession.id)
+        .join(Exercise, SessionSet.exercise_id == Exercise.id)
+        .where(in_range)
+        .where(SessionSet.is_completed == True)
+        .group_by(SessionSet.exercise_id, Exercise.name)
+        .order_by(func.sum(set_volume).desc())
+    ).all()
+
+    return TrainingAnalytics(
+        period=period,
+        start_date=start_date,
+        end_date=end_date,
+        buckets=[
+            VolumeBucket(period_start=b, sessions=sessions, sets=sets, volume=volume)
+            for b, sessions, sets, volume in bucket_rows
+        ],
+        exercises=[
+            ExerciseTonnage(exercise_id=ex_id, name=name, sets=sets, reps=reps, tonnage=tonnage)
+            for ex_id, name, sets, reps, tonnage in exercise_rows
+        ],
+    )
+
+@router.get("/records", response_model=List[PersonalRecordRead])
+def get_records(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # Maintained on write (app/services/records.py): one indexed read, no history scan
+    rows = session.exec(
+        select(PersonalRecord, Exercise.name)
+        .join(Exercise, PersonalRecord.exercise_id == Exercise.id)
+        .where(PersonalRecord.user_id == current_user.id)
+        .order_by(Exercise.name)
+    ).all()
+    return [PersonalRecordRead(**record.model_dump(), name=name) for record, name in rows]
+
+@router.get("/exercises/{exercise_id}/series", response_model=ExerciseSeries)
+def get_exercise_series(
+    exercise_id: uuid.UUID,
+    points: int = Query(default=settings.SERIES_DEFAULT_POINTS, ge=2, le=settings.SERIES_MAX_POINTS),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    exercise = session.get(Exercise, exercise_id)
+    if not exercise or exercise.user_id not in (None, current_user.id):
+        raise HTTPException(status_code=404, detail="Exercise not found")
+
+    # 1. One row per completed session: top set weight, best e1RM, volume
+    per_session = (
+        select(
+            WorkoutSession.start_time.label("start_time"),
+            func.max(SessionSet.weight).label("top_weight"),
+            func.max(epley_sql(SessionSet.weight, SessionSet.reps)).label("e1rm"),
+            func.sum(SessionSet.reps * SessionSet.weight).label("volume"),
+        )
+        .join(SessionSet, SessionSet.session_id == WorkoutSession.id)
         .where(WorkoutSession.user_id == current_user.id)
         .where(WorkoutSession.status == "completed")
-        .order_by(WorkoutSession.end_time.desc())
-        .limit(1)
-    ).first()
+        .where(SessionSet.exercise_id == exercise_id)
+        .where(SessionSet.is_completed == True)
+        .group_by(WorkoutSession.id, WorkoutSession.start_time)
+    )
+    if start_date:
+        per_session = per_session.where(WorkoutSession.start_time >= start_date)
+    if end_date:
+        per_session = per_session.where(WorkoutSession.start_time <= end_date)
+    per_session = per_session.subquery()
 
-    return UserStats(
-        total_workouts=total,
-        workouts_this_month=month_count,
-        last_workout_date=last_workout.end_time if last_workout else None
+    # 2. Downsample in SQL: ntile() splits the sessions into `points` equal runs
+    # (each session is its own run when there are fewer), then keep each run's max
+    bucketed = select(
+        per_session,
+        func.ntile(points).over(order_by=per_session.c.start_time).label("bucket"),
+    ).subquery()
+    rows = session.exec(
+        select(
+            func.min(bucketed.c.start_time),
+            func.count(),
+            func.max(bucketed.c.top_weight),
+            func.max(bucketed.c.e1rm),
+            func.max(bucketed.c.volume),
+        )
+        .group_by(bucketed.c.bucket)
+        .order_by(bucketed.c.bucket)
+    ).all()
+
+    series = [
+        SeriesPoint(date=date, sessions=sessions, top_weight=top_weight, e1rm=e1rm, volume=volume)
+        for date, sessions, top_weight, e1rm, volume in rows
+    ]
+    total_sessions = sum(p.sessions for p in series)
+    return ExerciseSeries(
+        exercise_id=exercise_id,
+        name=exercise.name,
+        total_sessions=total_sessions,
+        downsampled=total_sessions > len(series),
+        points=series,
     )
 
+@router.get("/export")
+def export_history(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_token_user)
+):
+    # Streamed straight from a DB cursor, one session at a time (app/services/export.py)
+    sessions = iter_sessions(current_user.id, start_date, end_date)
+    if format == "csv":
+        body, media_type = csv_chunks(sessions), "text/csv"
+    else:
+        body, media_type = ndjson_chunks(sessions), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="training-log.{format}"'},
+    )
 
+@router.post("/import", response_model=ImportReport)
+def import_history(
+    file: UploadFile,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    # The upload is spooled to disk by Starlette and parsed line by line from there;
+    # writes go in chunked bulk inserts (app/services/importer.py)
+    if format is None:
+        format = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    parsed = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+    try:
+        return import_sessions(session, current_user.id, parsed)
+    except UnicodeDecodeError:
+        session.rollback()
+        raise HTTPException(status_code=400, detail="File must be UTF-8 text")
 
 @router.get("/{session_id}", response_model=SessionDetailRead)
 def get_session_details(
     session_id: uuid.UUID,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_token_user)
 ):
     # 1. Get the Session
     workout_session = session.get(WorkoutSession, session_id)
@@ -155,33 +381,85 @@ def get_session_details(
 def update_session(
     session_id: uuid.UUID,
     update_data: SessionUpdate,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
+    # The session id is part of the scope, so one key can't replay onto another session
+    idempotency_scope = f"update_session:{session_id}"
+    stored = get_stored_response(session, current_user.id, idempotency_key, idempotency_scope, update_data)
+    if stored is not None:
+        return SessionRead(**stored)
+
     workout_session = session.get(WorkoutSession, session_id)
     if not workout_session or workout_session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found or authorized")
 
-    # Transaction: Replace Sets
+    # Diff the new sets against the stored ones, keyed on (exercise_id, set_number),
+    # so a one-rep fix is a single UPDATE instead of deleting + re-inserting everything.
+    incoming = {}
+    for s in update_data.sets:
+        key = (s.exercise_id, s.set_number)
+        if key in incoming:
+            raise HTTPException(status_code=400, detail=f"Duplicate set {s.set_number} for exercise {s.exercise_id}")
+        incoming[key] = s
+
     try:
-        # Delete old
-        existing = session.exec(select(SessionSet).where(SessionSet.session_id == session_id)).all()
-        for x in existing: session.delete(x)
-        
-        # Add new
-        for s in update_data.sets:
-            new_set = SessionSet(
-                session_id=session_id,
-                exercise_id=s.exercise_id,
-                set_number=s.set_number,
-                reps=s.reps,
-                weight=s.weight,
-                is_completed=s.is_completed
-            )
-            session.add(new_set)
+        existing = session.exec(
+            select(SessionSet.id, SessionSet.exercise_id, SessionSet.set_number,
+                   SessionSet.reps, SessionSet.weight, SessionSet.is_completed)
+            .where(SessionSet.session_id == session_id)
+        ).all()
+
+        to_delete, to_update = [], []
+        changed_exercises = set() # Their personal records may move (up or down)
+        for row in existing:
+            new = incoming.pop((row.exercise_id, row.set_number), None)
+            if new is None:
+                to_delete.append(row.id)
+                changed_exercises.add(row.exercise_id)
+            elif (row.reps, row.weight, row.is_completed) != (new.reps, new.weight, new.is_completed):
+                to_update.append({"id": row.id, "reps": new.reps, "weight": new.weight, "is_completed": new.is_completed})
+                changed_exercises.add(row.exercise_id)
+
+        # Whatever is left in `incoming` did not exist yet
+        to_insert = [
+            {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "exercise_id": s.exercise_id,
+                "set_number": s.set_number,
+                "reps": s.reps,
+                "weight": s.weight,
+                "is_completed": s.is_completed,
+            }
+            for s in incoming.values()
+        ]
+
+        if to_delete:
+            session.execute(delete(SessionSet).where(SessionSet.id.in_(to_delete)))
+            record_deletion(session, current_user.id, SessionSet, to_delete)
+        if to_update:
+            session.execute(update(SessionSet), to_update) # Bulk UPDATE by primary key
+        if to_insert:
+            session.execute(insert(SessionSet), to_insert)
+            changed_exercises.update(row["exercise_id"] for row in to_insert)
+
+        if changed_exercises:
+            recompute_records(session, current_user.id, changed_exercises)
+            bump_history_version(session, current_user.id) # Re-versions cached prescriptions on every worker
             
+        result = SessionRead(id=session_id, status=workout_session.status)
+        remember_response(session, current_user.id, idempotency_key, idempotency_scope, update_data, result)
         session.commit()
-        return SessionRead(id=workout_session.id, status=workout_session.status)
+        return result
+    except IntegrityError:
+        # A concurrent retry with the same key committed first
+        session.rollback()
+        stored = get_stored_response(session, current_user.id, idempotency_key, idempotency_scope, update_data)
+        if stored is None:
+            raise HTTPException(status_code=500, detail="Could not save session")
+        return SessionRead(**stored)
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,32 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlmodel import Session, select, col, or_
-from typing import List
-from datetime import timedelta, datetime
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from datetime import date, timedelta, datetime
 import uuid
 
 from app.db.database import get_session
-from app.db.models import WorkoutPlan, WorkoutRoutine, RoutineExercise, WorkoutSession
-from app.schemas.plan import PlanCreate, PlanRead, RoutineCreate, RoutineRead, RoutineExerciseCreate
+from app.db.models import WorkoutPlan, WorkoutRoutine, RoutineExercise, WorkoutSession, UserDataVersion
+from app.schemas.plan import PlanCreate, PlanRead, RoutineCreate, RoutineRead, RoutineExerciseCreate, TrainingCalendar
 from app.db.models import Exercise # Ensure Exercise is imported
 from app.schemas.plan import RoutineExerciseRead # Import the new schema
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
 from app.db.models import User
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_token_user
+from app.services.versions import bump_data_version
+from app.services.sync import record_deletion
+from app.services.catalog import get_system_catalog
+from app.core.etag import make_etag, etag_matches, etag_headers, not_modified
+from app.services.calendar import build_calendar
+from app.config import settings
 
 # 1. LIST PLANS
+def active_plans_statement(user_id: uuid.UUID):
+    # Filter by user_id
+    return (
+        select(WorkoutPlan)
+        .where(WorkoutPlan.is_active == True)
+        .where(WorkoutPlan.user_id == user_id) # <--- FILTER
+    )
+
 @router.get("/", response_model=List[PlanRead])
 def get_plans(
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user) # <--- ADD THIS
+    current_user: User = Depends(get_token_user) # <--- ADD THIS
 ):
-    # Filter by user_id
-    return session.exec(
-        select(WorkoutPlan)
-        .where(WorkoutPlan.is_active == True)
-        .where(WorkoutPlan.user_id == current_user.id) # <--- FILTER
-    ).all()
+    return session.exec(active_plans_statement(current_user.id)).all()
 
 # 2. CREATE PLAN
 @router.post("/", response_model=PlanRead)
@@ -64,11 +74,27 @@ def create_plan(
     )
     
     session.add(db_plan)
+    bump_data_version(session, current_user.id)
     session.commit()
     session.refresh(db_plan)
     
     return db_plan
 
+# --- 2b. TRAINING CALENDAR ---
+# Must be declared before /{plan_id}, or "calendar" would be parsed as a plan id
+@router.get("/calendar", response_model=TrainingCalendar)
+def get_calendar(
+    start: date,
+    end: date,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days + 1 > settings.CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.CALENDAR_MAX_DAYS} days per request")
+    return build_calendar(session, current_user.id, start, end)
+
 # --- 3. GET PLAN DETAILS (Deep Read) ---
 # Define response models locally or import them
 class RoutineWithExercises(RoutineRead):
@@ -77,31 +103,56 @@ class RoutineWithExercises(RoutineRead):
 class PlanDeepRead(PlanRead):
     routines: List[RoutineWithExercises]
 
+def load_plan_tree(session: Session, plan_id: uuid.UUID) -> Optional[WorkoutPlan]:
+    # Loads plan -> routines -> targets -> exercise in 4 queries total,
+    # no matter how many routines/exercises the plan has (selectin per level).
+    statement = (
+        select(WorkoutPlan)
+        .where(WorkoutPlan.id == plan_id)
+        .options(
+            selectinload(WorkoutPlan.routines)
+            .selectinload(WorkoutRoutine.exercises)
+            .selectinload(RoutineExercise.exercise)
+        )
+    )
+    return session.exec(statement).first()
+
 @router.get("/{plan_id}", response_model=PlanDeepRead)
-def get_plan_details(plan_id: uuid.UUID, session: Session = Depends(get_session)):
-    plan = session.get(WorkoutPlan, plan_id)
-    if not plan:
+def get_plan_details(
+    plan_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # Ownership + data version in one PK-backed read; the tree is only loaded on a miss
+    owned = session.exec(
+        select(WorkoutPlan.id, UserDataVersion.version)
+        .outerjoin(UserDataVersion, UserDataVersion.user_id == WorkoutPlan.user_id)
+        .where(WorkoutPlan.id == plan_id)
+        .where(WorkoutPlan.user_id == current_user.id)
+    ).first()
+    if not owned:
         raise HTTPException(status_code=404, detail="Plan not found")
-        
-    routines = session.exec(select(WorkoutRoutine).where(WorkoutRoutine.plan_id == plan_id)).all()
+
+    # The tree carries exercise names: system exercises change without a per-user bump
+    system_digest, _ = get_system_catalog(session)
+    etag = make_etag("plan", plan_id, owned.version or 0, system_digest)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+
+    plan = load_plan_tree(session, plan_id)
     
     routines_data = []
-    for r in routines:
-        targets = session.exec(
-            select(RoutineExercise)
-            .where(RoutineExercise.routine_id == r.id)
-            .order_by(RoutineExercise.order_index)
-        ).all()
+    for r in plan.routines:
+        targets = sorted(r.exercises, key=lambda t: t.order_index)
         
         exercises_list = []
         for t in targets:
-            # Fetch the name for each target
-            # (Optimization note: A JOIN query is faster, but this is clearer for now)
-            ex_def = session.get(Exercise, t.exercise_id)
-            
             exercises_list.append(RoutineExerciseRead(
                 **t.model_dump(),
-                name=ex_def.name if ex_def else "Unknown Exercise"
+                name=t.exercise.name if t.exercise else "Unknown Exercise"
             ))
 
         routine_obj = RoutineWithExercises(
@@ -137,14 +188,19 @@ def delete_plan(plan_id: uuid.UUID, session: Session = Depends(get_session)):
     if has_history:
         plan.is_active = False
         session.add(plan)
+        bump_data_version(session, plan.user_id)
         session.commit()
         return {"message": "Plan archived (history preserved)"}
     else:
         for r in routines:
             targets = session.exec(select(RoutineExercise).where(RoutineExercise.routine_id == r.id)).all()
             for t in targets: session.delete(t)
+            record_deletion(session, plan.user_id, RoutineExercise, [t.id for t in targets])
             session.delete(r)
         
+        record_deletion(session, plan.user_id, WorkoutRoutine, routine_ids)
+        record_deletion(session, plan.user_id, WorkoutPlan, [plan_id])
+        bump_data_version(session, plan.user_id)
         session.delete(plan)
         session.commit()
         return {"message": "Plan deleted permanently"}
@@ -152,12 +208,17 @@ def delete_plan(plan_id: uuid.UUID, session: Session = Depends(get_session)):
 # --- 5. SUB-RESOURCES ---
 @router.post("/{plan_id}/routines", response_model=RoutineRead)
 def add_routine(plan_id: uuid.UUID, routine_data: RoutineCreate, session: Session = Depends(get_session)):
+    plan = session.get(WorkoutPlan, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+
     routine = WorkoutRoutine(
         plan_id=plan_id,
         name=routine_data.name,
         day_of_week=routine_data.day_of_week
     )
     session.add(routine)
+    bump_data_version(session, plan.user_id)
     session.commit()
     session.refresh(routine)
     return routine
@@ -179,12 +240,17 @@ def add_exercise_target(routine_id: uuid.UUID, target_data: RoutineExerciseCreat
         increment_value=target_data.increment_value
     )
     session.add(target)
+    bump_data_version(session, routine.plan.user_id)
     session.commit()
     return target
 
 
 @router.post("/{plan_id}/routines", response_model=RoutineRead)
 def add_routine(plan_id: uuid.UUID, routine_data: RoutineCreate, session: Session = Depends(get_session)):
+    plan = session.get(WorkoutPlan, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+
     routine = WorkoutRoutine(
         plan_id=plan_id,
         name=routine_data.name,
@@ -192,6 +258,7 @@ def add_routine(plan_id: uuid.UUID, routine_data: RoutineCreate, session: Sessio
         routine_type=routine_data.routine_type # <--- SAVE IT
     )
     session.add(routine)
+    bump_data_version(session, plan.user_id)
     session.commit()
     session.refresh(routine)
     return routine
\ No newline at end of file
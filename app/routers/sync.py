@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from typing import Optional
+
+from app.db.database import get_session
+from app.db.models import User
+from app.core.security import get_token_user
+from app.schemas.sync import SyncChanges
+from app.services.sync import get_changes
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+@router.get("", response_model=SyncChanges)
+def sync(
+    token: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user)
+):
+    # No token (first launch / reinstall): everything. Otherwise only what changed since.
+    return get_changes(session, current_user.id, token)
@@ -1,104 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlmodel import Session, select
-from typing import List
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 import uuid
 
 from app.db.database import get_session
-from app.db.models import WorkoutRoutine, RoutineExercise, Exercise, WorkoutSession, SessionSet, User, WorkoutPlan
-from app.schemas.workout import RoutineStart, ExercisePreview, SetTarget, WorkoutRoutineRead
+from app.db.models import WorkoutRoutine, WorkoutSession, SessionSet, User, WorkoutPlan, UserWorkoutStats, UserDataVersion
+from app.schemas.workout import RoutineStart, WorkoutRoutineRead
 from app.schemas.session import SessionCreate, SessionRead
-from app.core.security import get_current_user # <--- Auth
+from app.core.security import get_current_user, get_token_user # <--- Auth
+from app.core.idempotency import get_stored_response, remember_response
+from app.services.stats import record_completed_session
+from app.services.records import record_new_sets
+from app.services.progression import get_prescription
 
 router = APIRouter(prefix="/workouts", tags=["workouts"])
 
-@router.get("/routines", response_model=List[WorkoutRoutineRead])
-def get_routines(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user) # <--- Auth
-):
+def last_completed_subquery(user_id: uuid.UUID):
+    # Last completion per routine, grouped once for all routines (no per-routine query)
+    return (
+        select(
+            WorkoutSession.routine_id,
+            func.max(WorkoutSession.end_time).label("last_completed_at")
+        )
+        .where(WorkoutSession.user_id == user_id) # <--- Filter History
+        .where(WorkoutSession.status == "completed")
+        .group_by(WorkoutSession.routine_id)
+        .subquery()
+    )
+
+def routines_statement(user_id: uuid.UUID):
+    last_completed = last_completed_subquery(user_id)
+
     # Join Routine -> Plan -> User to filter
-    statement = (
-        select(WorkoutRoutine)
+    return (
+        select(
+            WorkoutRoutine.id,
+            WorkoutRoutine.name,
+            WorkoutRoutine.day_of_week,
+            last_completed.c.last_completed_at
+        )
         .join(WorkoutPlan)
-        .where(WorkoutPlan.user_id == current_user.id)
+        .outerjoin(last_completed, last_completed.c.routine_id == WorkoutRoutine.id)
+        .where(WorkoutPlan.user_id == user_id)
         .where(WorkoutPlan.is_active == True)
     )
-    routines = session.exec(statement).all()
-    
-    response = []
-    for r in routines:
-        last_session = session.exec(
-            select(WorkoutSession)
-            .where(WorkoutSession.routine_id == r.id)
-            .where(WorkoutSession.user_id == current_user.id) # <--- Filter History
-            .where(WorkoutSession.status == "completed")
-            .order_by(WorkoutSession.end_time.desc())
-            .limit(1)
-        ).first()
-        
-        response.append(WorkoutRoutineRead(
-            id=r.id,
-            name=r.name,
-            day_of_week=r.day_of_week,
-            last_completed_at=last_session.end_time if last_session else None
-        ))
-        
-    return response
+
+def routines_response(rows) -> List[WorkoutRoutineRead]:
+    return [
+        WorkoutRoutineRead(
+            id=routine_id,
+            name=name,
+            day_of_week=day_of_week,
+            last_completed_at=last_completed_at
+        )
+        for routine_id, name, day_of_week, last_completed_at in rows
+    ]
+
+@router.get("/routines", response_model=List[WorkoutRoutineRead])
+def get_routines(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_token_user) # <--- Auth
+):
+    rows = session.exec(routines_statement(current_user.id)).all()
+    return routines_response(rows)
 
 @router.get("/start/{routine_id}", response_model=RoutineStart)
 def start_workout_session(
     routine_id: uuid.UUID, 
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_token_user)
 ):
-    # Verify ownership via Plan
-    routine = session.exec(
-        select(WorkoutRoutine)
+    # Verify ownership via Plan; the stats and version rows version the cached prescription
+    row = session.exec(
+        select(
+            WorkoutRoutine.id, WorkoutRoutine.name, UserWorkoutStats.total_workouts,
+            UserDataVersion.version, UserDataVersion.history_version,
+        )
         .join(WorkoutPlan)
+        .outerjoin(UserWorkoutStats, UserWorkoutStats.user_id == WorkoutPlan.user_id)
+        .outerjoin(UserDataVersion, UserDataVersion.user_id == WorkoutPlan.user_id)
         .where(WorkoutRoutine.id == routine_id)
         .where(WorkoutPlan.user_id == current_user.id)
     ).first()
     
-    if not routine:
+    if not row:
         raise HTTPException(status_code=404, detail="Routine not found")
+    routine_id, routine_name, completed_count, data_version, history_version = row
         
-    routine_exercises = session.exec(
-        select(RoutineExercise)
-        .where(RoutineExercise.routine_id == routine_id)
-        .order_by(RoutineExercise.order_index)
-    ).all()
-    
-    response_exercises = []
-    for rx in routine_exercises:
-        exercise_def = session.get(Exercise, rx.exercise_id)
-        
-        sets_list = []
-        for i in range(1, rx.target_sets + 1):
-            sets_list.append(SetTarget(
-                set_number=i,
-                target_reps=rx.target_reps,
-                target_weight=rx.target_weight
-            ))
-            
-        response_exercises.append(ExercisePreview(
-            exercise_id=rx.exercise_id,
-            name=exercise_def.name if exercise_def else "Unknown",
-            sets=sets_list,
-            increment_value=rx.increment_value
-        ))
+    # Targets progressed from history (cached until the next finished session or edit)
+    version = (completed_count or 0, data_version or 0, history_version or 0)
+    exercises = get_prescription(session, current_user.id, routine_id, version)
         
     return RoutineStart(
-        routine_id=routine.id,
-        name=routine.name,
-        exercises=response_exercises
+        routine_id=routine_id,
+        name=routine_name,
+        exercises=exercises
     )
 
 @router.post("/finish", response_model=SessionRead)
 def finish_workout(
     session_data: SessionCreate, 
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user) # <--- Auth
 ):
+    # Retry of a finish we already saved? Return the stored result, write nothing.
+    stored = get_stored_response(db, current_user.id, idempotency_key, "finish_workout", session_data)
+    if stored is not None:
+        return SessionRead(**stored)
+
+    # One transaction: the session row, then all sets in a single bulk
+    # (executemany) INSERT. Ids are generated here, so no refresh round trip.
     workout_session = WorkoutSession(
         routine_id=session_data.routine_id,
         start_time=session_data.start_time,
@@ -107,20 +121,40 @@ def finish_workout(
         user_id=current_user.id # <--- Assign Owner
     )
     db.add(workout_session)
-    db.commit()
-    db.refresh(workout_session)
+    db.flush() # Sets reference the session, so it has to be inserted first
+    session_id = workout_session.id # Read before commit expires the object
     
-    for s in session_data.sets:
-        db_set = SessionSet(
-            session_id=workout_session.id,
-            exercise_id=s.exercise_id,
-            set_number=s.set_number,
-            reps=s.reps,
-            weight=s.weight,
-            is_completed=s.is_completed
-        )
-        db.add(db_set)
+    if session_data.sets:
+        db.execute(insert(SessionSet), [
+            {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "exercise_id": s.exercise_id,
+                "set_number": s.set_number,
+                "reps": s.reps,
+                "weight": s.weight,
+                "is_completed": s.is_completed,
+            }
+            for s in session_data.sets
+        ])
+
+    record_completed_session(db, current_user.id, session_data.start_time, session_data.end_time)
+    record_new_sets(db, current_user.id, [
+        (s.exercise_id, s.weight, s.reps, session_data.start_time)
+        for s in session_data.sets if s.is_completed
+    ])
+    
+    result = SessionRead(id=session_id, status="completed")
+    remember_response(db, current_user.id, idempotency_key, "finish_workout", session_data, result)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first
+        db.rollback()
+        stored = get_stored_response(db, current_user.id, idempotency_key, "finish_workout", session_data)
+        if stored is None:
+            raise
+        return SessionRead(**stored)
     
-    return SessionRead(id=workout_session.id, status="completed")
\ No newline at end of file
+    return result
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import date, datetime
+import uuid
+
+# --- TRAINING VOLUME ANALYTICS ---
+class VolumeBucket(BaseModel):
+    period_start: date
+    sessions: int
+    sets: int
+    volume: float # sum(reps * weight) over completed sets
+
+class ExerciseTonnage(BaseModel):
+    exercise_id: uuid.UUID
+    name: str
+    sets: int
+    reps: int
+    tonnage: float
+
+class TrainingAnalytics(BaseModel):
+    period: Literal["week", "month"]
+    start_date: datetime
+    end_date: datetime
+    buckets: List[VolumeBucket]
+    exercises: List[ExerciseTonnage]
+
+# --- PERSONAL RECORDS ---
+class PersonalRecordRead(BaseModel):
+    exercise_id: uuid.UUID
+    name: str
+    max_weight: float
+    max_weight_reps: int
+    max_weight_at: Optional[datetime] = None
+    best_e1rm: float # Epley
+    best_e1rm_brzycki: float
+    best_e1rm_at: Optional[datetime] = None
+    best_set_volume: float
+    best_set_volume_at: Optional[datetime] = None
+
+# --- EXERCISE PROGRESS SERIES ---
+class SeriesPoint(BaseModel):
+    date: datetime # First session in the point
+    sessions: int # Sessions merged into this point (1 unless downsampled)
+    top_weight: float
+    e1rm: float # Epley
+    volume: float
+
+class ExerciseSeries(BaseModel):
+    exercise_id: uuid.UUID
+    name: str
+    total_sessions: int
+    downsampled: bool
+    points: List[SeriesPoint]
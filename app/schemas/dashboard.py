@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+import uuid
+
+# --- HOME SCREEN ---
+class DashboardRoutine(BaseModel):
+    id: uuid.UUID
+    name: str
+    routine_type: str
+    day_of_week: Optional[int] = None # 0=Monday; None = floating
+    scheduled_for: Optional[date] = None # This week's date for day_of_week
+    last_completed_at: Optional[datetime] = None
+    done_this_week: bool
+
+class Dashboard(BaseModel):
+    week_start: date # Monday
+    this_week: List[DashboardRoutine] # Scheduled routines of the active plan(s), by day
+    floating: List[DashboardRoutine] # Routines without a day
+    workouts_this_week: int
+    workouts_this_month: int
+    total_workouts: int
+    last_workout_date: Optional[datetime] = None
+    streak_weeks: int # Consecutive weeks with a workout, up to this one (or last one, if none yet)
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+# --- TRAINING LOG EXPORT FORMAT ---
+# NDJSON: one ExportedSession per line.
+# CSV: one row per set (EXPORT_CSV_COLUMNS), session fields repeated on each row;
+# a session without sets is a single row with empty set columns.
+
+class ExportedSet(BaseModel):
+    exercise_id: Optional[uuid.UUID] = None
+    exercise_name: str
+    set_number: int
+    reps: int
+    weight: float
+    is_completed: bool = True
+
+class ExportedSession(BaseModel):
+    id: Optional[uuid.UUID] = None
+    routine_name: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    status: str = "completed"
+    sets: List[ExportedSet] = []
+
+EXPORT_CSV_COLUMNS = [
+    "session_id", "routine_name", "start_time", "end_time", "status",
+    "exercise_id", "exercise_name", "set_number", "reps", "weight", "is_completed",
+]
+
+# --- IMPORT REPORT ---
+class ImportRowError(BaseModel):
+    line: int # 1-based line of the upload (CSV: the session's first row)
+    error: str
+
+class ImportReport(BaseModel):
+    sessions_imported: int = 0
+    sets_imported: int = 0
+    sessions_skipped: int = 0 # Already there (same session id), e.g. a re-import
+    exercises_created: int = 0
+    error_count: int = 0
+    errors: List[ImportRowError] = [] # The first IMPORT_MAX_REPORTED_ERRORS only
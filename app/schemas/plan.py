@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 
 # --- PLAN SCHEMAS ---
@@ -43,4 +43,21 @@ class RoutineExerciseCreate(BaseModel):
 # NEW: This is the specific schema that includes the NAME
 class RoutineExerciseRead(RoutineExerciseCreate):
     id: uuid.UUID
-    name: str
\ No newline at end of file
+    name: str
+
+# --- CALENDAR SCHEMAS ---
+class CalendarEntry(BaseModel):
+    date: date
+    routine_id: uuid.UUID
+    routine_name: str
+    routine_type: str
+    plan_id: uuid.UUID
+    plan_name: str
+    scheduled: bool # False: a session done on a day the plan didn't schedule it
+    session_id: Optional[uuid.UUID] = None # Completed session for this entry, if any
+    completed_at: Optional[datetime] = None
+
+class TrainingCalendar(BaseModel):
+    start: date
+    end: date
+    entries: List[CalendarEntry] # By date
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+import uuid
+
+from app.db.models import Exercise, WorkoutPlan, WorkoutRoutine, RoutineExercise, WorkoutSession, SessionSet
+
+# Rows are sent as stored (all columns), so clients can mirror the tables as-is
+
+class Tombstone(BaseModel):
+    table: str # Table name, e.g. "sessionset"
+    id: uuid.UUID
+    deleted_at: datetime
+
+class SyncChanges(BaseModel):
+    token: str # Send it back as ?token= next time
+    full: bool # True: this is everything, drop local data first
+    exercises: List[Exercise]
+    plans: List[WorkoutPlan]
+    routines: List[WorkoutRoutine]
+    routine_exercises: List[RoutineExercise]
+    sessions: List[WorkoutSession]
+    sets: List[SessionSet]
+    deleted: List[Tombstone]
@@ -0,0 +1,111 @@
+import bisect
+import uuid
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.models import WorkoutPlan, WorkoutRoutine, WorkoutSession
+from app.schemas.plan import CalendarEntry, TrainingCalendar
+from app.services.versions import get_data_version
+
+# Training calendar = every plan's routines expanded into dated occurrences
+# (day_of_week, between the plan's start and end; archived plans stop on the
+# day they were archived, so their past stays visible), matched against completed
+# sessions. The expansion only changes when plans/routines do, so it is
+# cached per user together with the user's data version (bumped on every
+# plan/routine change): a request costs a PK read + one session range query.
+
+calendar_cache = TTLCache(maxsize=settings.CALENDAR_CACHE_SIZE, ttl=settings.CALENDAR_CACHE_TTL_SECONDS)
+
+
+class Occurrence(NamedTuple):
+    date: date
+    routine_id: uuid.UUID
+    routine_name: str
+    routine_type: str
+    plan_id: uuid.UUID
+    plan_name: str
+
+
+def expand_schedule(session: Session, user_id: uuid.UUID) -> list[Occurrence]:
+    rows = session.exec(
+        select(
+            WorkoutRoutine.id, WorkoutRoutine.name, WorkoutRoutine.routine_type, WorkoutRoutine.day_of_week,
+            WorkoutPlan.id, WorkoutPlan.name, WorkoutPlan.start_date, WorkoutPlan.end_date,
+            WorkoutPlan.is_active, WorkoutPlan.updated_at,
+        )
+        .join(WorkoutPlan)
+        .where(WorkoutPlan.user_id == user_id)
+        .where(WorkoutRoutine.day_of_week != None) # Floating routines have no dates
+    ).all()
+
+    occurrences = []
+    for (routine_id, routine_name, routine_type, day_of_week,
+         plan_id, plan_name, plan_start, plan_end, is_active, updated_at) in rows:
+        # Plans run [start, end): start + duration_weeks
+        end = plan_end.date()
+        if not is_active:
+            # Archiving is the plan's last write, so updated_at is when it was archived
+            end = min(end, updated_at.date() + timedelta(days=1))
+        day = plan_start.date() + timedelta(days=(day_of_week - plan_start.weekday()) % 7)
+        while day < end:
+            occurrences.append(Occurrence(day, routine_id, routine_name, routine_type, plan_id, plan_name))
+            day += timedelta(weeks=1)
+    occurrences.sort(key=lambda o: (o.date, o.routine_name))
+    return occurrences
+
+def get_schedule(session: Session, user_id: uuid.UUID) -> list[Occurrence]:
+    version = get_data_version(session, user_id)
+    cached = calendar_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    occurrences = expand_schedule(session, user_id)
+    calendar_cache.set(user_id, (version, occurrences))
+    return occurrences
+
+
+def build_calendar(session: Session, user_id: uuid.UUID, start: date, end: date) -> TrainingCalendar:
+    schedule = get_schedule(session, user_id)
+    dates = [o.date for o in schedule] # Sorted: slice the range with bisect
+    scheduled = schedule[bisect.bisect_left(dates, start):bisect.bisect_right(dates, end)]
+
+    # Completed sessions in the range, one query (with their routine/plan for off-schedule ones)
+    start_at = datetime.combine(start, datetime.min.time())
+    end_at = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    done = session.exec(
+        select(
+            WorkoutSession.id, WorkoutSession.start_time, WorkoutSession.end_time,
+            WorkoutRoutine.id, WorkoutRoutine.name, WorkoutRoutine.routine_type,
+            WorkoutPlan.id, WorkoutPlan.name,
+        )
+        .join(WorkoutRoutine, WorkoutSession.routine_id == WorkoutRoutine.id)
+        .join(WorkoutPlan, WorkoutRoutine.plan_id == WorkoutPlan.id)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .where(WorkoutSession.start_time >= start_at)
+        .where(WorkoutSession.start_time < end_at)
+        .order_by(WorkoutSession.start_time)
+    ).all()
+
+    entries = {(o.date, o.routine_id): CalendarEntry(**o._asdict(), scheduled=True) for o in scheduled}
+    extra = []
+    for session_id, start_time, end_time, routine_id, routine_name, routine_type, plan_id, plan_name in done:
+        entry = entries.get((start_time.date(), routine_id))
+        if entry is not None and entry.session_id is None:
+            entry.session_id, entry.completed_at = session_id, end_time
+            continue
+        extra.append(CalendarEntry(
+            date=start_time.date(), routine_id=routine_id, routine_name=routine_name,
+            routine_type=routine_type, plan_id=plan_id, plan_name=plan_name,
+            scheduled=False, session_id=session_id, completed_at=end_time,
+        ))
+
+    return TrainingCalendar(
+        start=start,
+        end=end,
+        entries=sorted([*entries.values(), *extra], key=lambda e: (e.date, e.routine_name)),
+    )
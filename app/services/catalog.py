@@ -0,0 +1,150 @@
+import hashlib
+import heapq
+import re
+import uuid
+from typing import Optional
+
+from sqlalchemy import event, func, literal, or_
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.models import Exercise
+from app.schemas.exercise import ExerciseRead
+
+# GET /exercises/ = system exercises (same for everyone) + the user's custom ones.
+# The system part is serialized once per process and cached together with a
+# digest of its content (part of the catalog ETag); per request only the
+# user's custom rows are queried and merged in, keeping the (name, id) order.
+
+system_catalog_cache = TTLCache(maxsize=1, ttl=settings.SYSTEM_CATALOG_TTL_SECONDS)
+_SYSTEM = "system"
+
+# ((name, id), serialized ExerciseRead)
+CatalogEntry = tuple[tuple[str, str], bytes]
+
+
+def system_catalog_statement():
+    return select(Exercise).where(Exercise.user_id == None)
+
+def custom_catalog_statement(user_id: uuid.UUID):
+    return select(Exercise).where(Exercise.user_id == user_id)
+
+def _entries(rows) -> list[CatalogEntry]:
+    # Sorted in Python, so the merge doesn't depend on the database's collation
+    return sorted(
+        ((row.name, str(row.id)), ExerciseRead.model_validate(row).model_dump_json().encode())
+        for row in rows
+    )
+
+def _system_catalog(rows) -> tuple[str, list[CatalogEntry]]:
+    entries = _entries(rows)
+    digest = hashlib.sha256(b"\n".join(body for _, body in entries)).hexdigest()[:16]
+    return digest, entries
+
+
+def get_system_catalog(session: Session) -> tuple[str, list[CatalogEntry]]:
+    cached = system_catalog_cache.get(_SYSTEM)
+    if cached is None:
+        cached = _system_catalog(session.exec(system_catalog_statement()).all())
+        system_catalog_cache.set(_SYSTEM, cached)
+    return cached
+
+async def get_system_catalog_async(session: AsyncSession) -> tuple[str, list[CatalogEntry]]:
+    cached = system_catalog_cache.get(_SYSTEM)
+    if cached is None:
+        cached = _system_catalog((await session.exec(system_catalog_statement())).all())
+        system_catalog_cache.set(_SYSTEM, cached)
+    return cached
+
+def invalidate_system_catalog():
+    system_catalog_cache.clear()
+
+@event.listens_for(Exercise, "after_insert")
+@event.listens_for(Exercise, "after_update")
+@event.listens_for(Exercise, "after_delete")
+def _invalidate_on_system_write(mapper, connection, target: Exercise):
+    # Writes from this process (e.g. seeding) drop the cache; other processes rely on the TTL
+    if target.user_id is None or not target.is_custom:
+        invalidate_system_catalog()
+
+
+def render_catalog(system_entries: list[CatalogEntry], custom_rows) -> bytes:
+    """The JSON array for GET /exercises/, built from pre-serialized items."""
+    merged = heapq.merge(system_entries, _entries(custom_rows))
+    return b"[" + b",".join(body for _, body in merged) + b"]"
+
+
+# --- Search ---
+# Postgres: pg_trgm, backed by the GIN index from migration 0006 (ILIKE 'q%' for
+# prefixes, the <% word-similarity operator for fuzzy matches).
+# SQLite has no trigram support, so an in-memory trigram index over the cached
+# system catalog is used instead (rebuilt when the catalog's digest changes),
+# and the user's custom rows are scored on the fly.
+
+_system_search_index = TTLCache(maxsize=1, ttl=settings.SYSTEM_CATALOG_TTL_SECONDS)
+
+def trigrams(text: str) -> set[str]:
+    # Same scheme as pg_trgm: lowercase words, padded with 2 spaces in front and 1 after
+    grams = set()
+    for word in re.findall(r"[^\W_]+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _score(query: str, query_grams: set[str], name: str, name_grams: set[str]) -> Optional[tuple[bool, float]]:
+    similarity = len(query_grams & name_grams) / len(query_grams) if query_grams else 0.0
+    is_prefix = name.lower().startswith(query)
+    if not is_prefix and similarity < settings.EXERCISE_SEARCH_MIN_SIMILARITY:
+        return None
+    return is_prefix, similarity
+
+def _system_index(digest: str, entries: list[CatalogEntry]) -> list[tuple[str, set[str], bytes]]:
+    index = _system_search_index.get(digest)
+    if index is None:
+        index = [(name, trigrams(name), body) for (name, _), body in entries]
+        _system_search_index.clear()
+        _system_search_index.set(digest, index)
+    return index
+
+def _search_in_memory(session: Session, user_id: uuid.UUID, q: str, limit: int) -> list[bytes]:
+    query, query_grams = q.lower(), trigrams(q)
+    candidates = list(_system_index(*get_system_catalog(session)))
+    candidates += [
+        (name, trigrams(name), body)
+        for (name, _), body in _entries(session.exec(custom_catalog_statement(user_id)).all())
+    ]
+
+    # Prefix matches first, then by similarity, then by name
+    hits = []
+    for name, name_grams, body in candidates:
+        score = _score(query, query_grams, name, name_grams)
+        if score is not None:
+            is_prefix, similarity = score
+            hits.append(((not is_prefix, -similarity, name), body))
+    return [body for _, body in heapq.nsmallest(limit, hits, key=lambda hit: hit[0])]
+
+def _search_postgres(session: Session, user_id: uuid.UUID, q: str, limit: int) -> list[bytes]:
+    # The <% operator reads its threshold from this setting (transaction-local)
+    session.execute(select(func.set_config(
+        "pg_trgm.word_similarity_threshold", str(settings.EXERCISE_SEARCH_MIN_SIMILARITY), True
+    )))
+    escaped = q.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    is_prefix = Exercise.name.ilike(f"{escaped}%", escape="/")
+    rows = session.exec(
+        select(Exercise)
+        .where(or_(Exercise.user_id == None, Exercise.user_id == user_id))
+        .where(or_(is_prefix, literal(q).op("<%")(Exercise.name)))
+        .order_by(is_prefix.desc(), func.word_similarity(q, Exercise.name).desc(), Exercise.name)
+        .limit(limit)
+    ).all()
+    return [ExerciseRead.model_validate(row).model_dump_json().encode() for row in rows]
+
+def search_exercises(session: Session, user_id: uuid.UUID, q: str, limit: int) -> bytes:
+    """JSON array of the best matches among system + the user's exercises, best first."""
+    if session.get_bind().dialect.name == "postgresql":
+        bodies = _search_postgres(session, user_id, q, limit)
+    else:
+        bodies = _search_in_memory(session, user_id, q, limit)
+    return b"[" + b",".join(bodies) + b"]"
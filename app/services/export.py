@@ -0,0 +1,109 @@
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlmodel import Session, select
+
+from app.db.database import engine
+from app.db.models import WorkoutSession, WorkoutRoutine, SessionSet, Exercise
+from app.schemas.export import ExportedSession, ExportedSet, EXPORT_CSV_COLUMNS
+
+# Streams a user's whole training log with flat memory use:
+#   - one ordered query, read with yield_per (a server-side cursor on Postgres)
+#   - rows are folded into one session at a time, then written out
+#   - output is buffered into ~64KB chunks for StreamingResponse
+
+STREAM_BATCH_ROWS = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def _export_statement(user_id: uuid.UUID, start_date: Optional[datetime], end_date: Optional[datetime]):
+    statement = (
+        select(
+            WorkoutSession.id, WorkoutRoutine.name, WorkoutSession.start_time,
+            WorkoutSession.end_time, WorkoutSession.status,
+            SessionSet.exercise_id, Exercise.name, SessionSet.set_number,
+            SessionSet.reps, SessionSet.weight, SessionSet.is_completed,
+        )
+        .select_from(WorkoutSession)
+        .join(WorkoutRoutine, WorkoutSession.routine_id == WorkoutRoutine.id)
+        .outerjoin(SessionSet, SessionSet.session_id == WorkoutSession.id)
+        .outerjoin(Exercise, SessionSet.exercise_id == Exercise.id)
+        .where(WorkoutSession.user_id == user_id)
+        .order_by(WorkoutSession.start_time, WorkoutSession.id, SessionSet.exercise_id, SessionSet.set_number)
+    )
+    if start_date:
+        statement = statement.where(WorkoutSession.start_time >= start_date)
+    if end_date:
+        statement = statement.where(WorkoutSession.start_time <= end_date)
+    return statement
+
+def iter_sessions(
+    user_id: uuid.UUID, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+) -> Iterator[ExportedSession]:
+    # Own session: the generator outlives the request's dependencies
+    with Session(engine) as session:
+        result = session.execute(
+            _export_statement(user_id, start_date, end_date).execution_options(yield_per=STREAM_BATCH_ROWS)
+        )
+        current = None
+        for (session_id, routine_name, start_time, end_time, status,
+             exercise_id, exercise_name, set_number, reps, weight, is_completed) in result:
+            if current is None or current.id != session_id:
+                if current is not None:
+                    yield current
+                current = ExportedSession(
+                    id=session_id, routine_name=routine_name, start_time=start_time,
+                    end_time=end_time, status=status, sets=[],
+                )
+            if set_number is not None: # Outer join: sessions without sets
+                current.sets.append(ExportedSet(
+                    exercise_id=exercise_id, exercise_name=exercise_name or "Unknown",
+                    set_number=set_number, reps=reps, weight=weight, is_completed=is_completed,
+                ))
+        if current is not None:
+            yield current
+
+
+def _chunked(pieces: Iterator[str]) -> Iterator[bytes]:
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+def ndjson_chunks(sessions: Iterator[ExportedSession]) -> Iterator[bytes]:
+    return _chunked(s.model_dump_json() + "\n" for s in sessions)
+
+def _csv_lines(sessions: Iterator[ExportedSession]) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def line(row) -> str:
+        writer.writerow(row)
+        value = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return value
+
+    yield line(EXPORT_CSV_COLUMNS)
+    for s in sessions:
+        session_columns = [
+            s.id, s.routine_name, s.start_time.isoformat(),
+            s.end_time.isoformat() if s.end_time else "", s.status,
+        ]
+        if not s.sets:
+            yield line(session_columns + [""] * 6)
+        for st in s.sets:
+            yield line(session_columns + [
+                st.exercise_id or "", st.exercise_name, st.set_number, st.reps, st.weight, st.is_completed,
+            ])
+
+def csv_chunks(sessions: Iterator[ExportedSession]) -> Iterator[bytes]:
+    return _chunked(_csv_lines(sessions))
@@ -0,0 +1,300 @@
+import csv
+import math
+import uuid
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, update
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.db.models import Exercise, WorkoutPlan, WorkoutRoutine, WorkoutSession, SessionSet
+from app.schemas.export import ExportedSession, EXPORT_CSV_COLUMNS, ImportReport, ImportRowError
+from app.services.stats import to_utc_naive, rebuild_user_stats
+from app.services.records import recompute_records
+from app.services.versions import bump_data_version
+
+# Bulk import of a training log in the /history/export format (NDJSON or CSV).
+#   1. parse the upload lazily, one session at a time (bad rows -> errors, not a failure)
+#   2. per chunk of IMPORT_CHUNK_SESSIONS: resolve exercises/routines from maps loaded
+#      once up front (missing ones are created in one INSERT), skip session ids that
+#      already exist (one IN query), bulk insert sessions + sets, commit
+#   3. once at the end: rebuild the stats aggregates and personal records
+# Sessions land under routines (by routine_name) of an inactive "Imported history" plan.
+
+IMPORT_PLAN_NAME = "Imported history"
+
+# (first line number, parsed session) or (line number, error message)
+Parsed = tuple[int, Union[ExportedSession, str]]
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in e.errors()
+    )
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Parsed]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, ExportedSession.model_validate_json(line)
+        except ValidationError as e:
+            yield line_number, _validation_message(e)
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Parsed]:
+    reader = csv.DictReader(lines)
+    missing = {"routine_name", "start_time"} - set(reader.fieldnames or [])
+    if missing:
+        yield 1, f"Missing CSV columns: {', '.join(sorted(missing))} (expected {', '.join(EXPORT_CSV_COLUMNS)})"
+        return
+
+    # Consecutive rows with the same session (id, or routine + start when there is no id) form one session
+    current, current_key, first_line = None, None, 0
+    for row in reader:
+        line_number = reader.line_num
+        key = row.get("session_id") or (row.get("routine_name"), row.get("start_time"))
+        if key != current_key:
+            if current_key is not None:
+                yield first_line, current
+            current_key, first_line = key, line_number
+            current = {
+                "id": row.get("session_id") or None,
+                "routine_name": row.get("routine_name"),
+                "start_time": row.get("start_time"),
+                "end_time": row.get("end_time") or None,
+                "status": row.get("status") or "completed",
+                "sets": [],
+            }
+        if row.get("exercise_name") or row.get("exercise_id"):
+            current["sets"].append({
+                "exercise_id": row.get("exercise_id") or None,
+                "exercise_name": row.get("exercise_name") or "",
+                "set_number": row.get("set_number"),
+                "reps": row.get("reps"),
+                "weight": row.get("weight"),
+                "is_completed": row.get("is_completed") or True,
+            })
+    if current_key is not None:
+        yield first_line, current
+
+
+def _validated(parsed: Iterable[tuple[int, Union[ExportedSession, dict, str]]]) -> Iterator[Parsed]:
+    for line_number, item in parsed:
+        if isinstance(item, dict):
+            try:
+                item = ExportedSession.model_validate(item)
+            except ValidationError as e:
+                item = _validation_message(e)
+        if isinstance(item, ExportedSession):
+            if not item.routine_name.strip() or any(not st.exercise_name.strip() for st in item.sets):
+                item = "routine_name and every set's exercise_name are required"
+            else:
+                # Stored as naive UTC, like everything else
+                item.start_time = to_utc_naive(item.start_time)
+                item.end_time = to_utc_naive(item.end_time) if item.end_time else None
+        yield line_number, item
+
+
+class _Resolver:
+    """Exercise / routine ids for names, loaded once and extended as rows get created."""
+
+    def __init__(self, session: Session, user_id: uuid.UUID):
+        self.session = session
+        self.user_id = user_id
+
+        # One lookup for the whole catalog; the user's own exercises win over system ones
+        self.exercise_ids: set[uuid.UUID] = set()
+        self.exercise_by_name: dict[str, uuid.UUID] = {}
+        rows = session.exec(
+            select(Exercise.id, Exercise.name, Exercise.user_id)
+            .where(or_(Exercise.user_id == None, Exercise.user_id == user_id))
+        ).all()
+        for exercise_id, name, owner in sorted(rows, key=lambda r: r[2] is not None):
+            self.exercise_ids.add(exercise_id)
+            self.exercise_by_name[name.strip().lower()] = exercise_id
+
+        self.plan_id: Optional[uuid.UUID] = session.exec(
+            select(WorkoutPlan.id)
+            .where(WorkoutPlan.user_id == user_id)
+            .where(WorkoutPlan.name == IMPORT_PLAN_NAME)
+        ).first()
+        self.routine_by_name: dict[str, uuid.UUID] = {}
+        if self.plan_id:
+            for routine_id, name in session.exec(
+                select(WorkoutRoutine.id, WorkoutRoutine.name).where(WorkoutRoutine.plan_id == self.plan_id)
+            ).all():
+                self.routine_by_name[name.strip().lower()] = routine_id
+
+        self.exercises_created = 0
+
+    def create_missing(self, sessions: list[ExportedSession]):
+        new_exercises, new_routines = {}, {}
+        for s in sessions:
+            key = s.routine_name.strip().lower()
+            if key not in self.routine_by_name and key not in new_routines:
+                new_routines[key] = s.routine_name.strip()
+            for st in s.sets:
+                if st.exercise_id in self.exercise_ids:
+                    continue
+                key = st.exercise_name.strip().lower()
+                if key not in self.exercise_by_name and key not in new_exercises:
+                    new_exercises[key] = st.exercise_name.strip()
+
+        if new_exercises:
+            rows = [
+                {"id": uuid.uuid4(), "name": name, "user_id": self.user_id, "is_custom": True,
+                 "default_increment": 0.0, "unit": "kg"}
+                for name in new_exercises.values()
+            ]
+            self.session.execute(insert(Exercise), rows)
+            for row in rows:
+                self.exercise_ids.add(row["id"])
+                self.exercise_by_name[row["name"].lower()] = row["id"]
+            self.exercises_created += len(rows)
+
+        if new_routines:
+            if self.plan_id is None:
+                self.plan_id = uuid.uuid4()
+                self.session.execute(insert(WorkoutPlan), [{
+                    "id": self.plan_id, "name": IMPORT_PLAN_NAME, "user_id": self.user_id,
+                    "description": "Sessions brought in by a bulk import",
+                    # Dates are set to the imported range by fit_plan_dates()
+                    "duration_weeks": 1, "start_date": sessions[0].start_time, "end_date": sessions[0].start_time,
+                    "is_active": False, "created_at": datetime.utcnow(),
+                }])
+            rows = [
+                {"id": uuid.uuid4(), "plan_id": self.plan_id, "name": name, "routine_type": "workout"}
+                for name in new_routines.values()
+            ]
+            self.session.execute(insert(WorkoutRoutine), rows)
+            for row in rows:
+                self.routine_by_name[row["name"].lower()] = row["id"]
+
+    def fit_plan_dates(self):
+        first, last = self.session.exec(
+            select(func.min(WorkoutSession.start_time), func.max(WorkoutSession.start_time))
+            .join(WorkoutRoutine, WorkoutSession.routine_id == WorkoutRoutine.id)
+            .where(WorkoutRoutine.plan_id == self.plan_id)
+        ).one()
+        if first is None:
+            return
+        self.session.execute(
+            update(WorkoutPlan)
+            .where(WorkoutPlan.id == self.plan_id)
+            .values(start_date=first, end_date=last, duration_weeks=max(1, math.ceil((last - first).days / 7)))
+        )
+
+    def exercise_id(self, exercise_id: Optional[uuid.UUID], name: str) -> uuid.UUID:
+        if exercise_id in self.exercise_ids:
+            return exercise_id
+        return self.exercise_by_name[name.strip().lower()]
+
+    def routine_id(self, name: str) -> uuid.UUID:
+        return self.routine_by_name[name.strip().lower()]
+
+
+def _write_chunk(session: Session, resolver: _Resolver, chunk: list[tuple[int, ExportedSession]], report: ImportReport):
+    # Re-imports: sessions whose id this user already has are skipped (one IN query per chunk).
+    # An id taken by another account (moving a log between accounts) is replaced by one
+    # derived from it, so importing the same file twice still skips instead of duplicating.
+    derived = {s.id: uuid.uuid5(resolver.user_id, str(s.id)) for _, s in chunk if s.id}
+    candidate_ids = [*derived, *derived.values()]
+    owners = {}
+    if candidate_ids:
+        owners = dict(session.exec(
+            select(WorkoutSession.id, WorkoutSession.user_id).where(WorkoutSession.id.in_(candidate_ids))
+        ).all())
+
+    fresh = []
+    for _, s in chunk:
+        if s.id in owners and owners[s.id] != resolver.user_id:
+            s.id = derived[s.id]
+        if s.id in owners:
+            report.sessions_skipped += 1
+            continue
+        if s.id:
+            owners[s.id] = resolver.user_id # Same id twice in one file
+        fresh.append(s)
+    if not fresh:
+        return
+
+    resolver.create_missing(fresh)
+    session_rows, set_rows = [], []
+    for s in fresh:
+        session_id = s.id or uuid.uuid4()
+        session_rows.append({
+            "id": session_id,
+            "routine_id": resolver.routine_id(s.routine_name),
+            "user_id": resolver.user_id,
+            "start_time": s.start_time,
+            "end_time": s.end_time,
+            "status": s.status,
+        })
+        set_rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "exercise_id": resolver.exercise_id(st.exercise_id, st.exercise_name),
+                "set_number": st.set_number,
+                "reps": st.reps,
+                "weight": st.weight,
+                "is_completed": st.is_completed,
+            }
+            for st in s.sets
+        )
+
+    session.execute(insert(WorkoutSession), session_rows)
+    if set_rows:
+        session.execute(insert(SessionSet), set_rows)
+    report.sessions_imported += len(session_rows)
+    report.sets_imported += len(set_rows)
+    report.exercises_created = resolver.exercises_created
+
+
+def import_sessions(
+    session: Session,
+    user_id: uuid.UUID,
+    parsed: Iterable[tuple[int, Union[ExportedSession, dict, str]]],
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Writes the parsed sessions in chunks, committing after each one, so a
+    big file never sits in memory or in one long transaction.
+    """
+    report = ImportReport()
+    resolver = _Resolver(session, user_id)
+
+    def add_error(line: int, error: str):
+        report.error_count += 1
+        if len(report.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(line=line, error=error))
+
+    def flush(chunk):
+        _write_chunk(session, resolver, chunk, report)
+        session.commit()
+        if on_progress:
+            on_progress(report)
+
+    chunk = []
+    for line_number, item in _validated(parsed):
+        if isinstance(item, str):
+            add_error(line_number, item)
+            continue
+        chunk.append((line_number, item))
+        if len(chunk) >= settings.IMPORT_CHUNK_SESSIONS:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    if report.sessions_imported:
+        # Derived data, recomputed once rather than per session
+        resolver.fit_plan_dates()
+        rebuild_user_stats(session, user_id)
+        recompute_records(session, user_id)
+        bump_data_version(session, user_id)
+        session.commit()
+    return report
@@ -0,0 +1,127 @@
+import uuid
+from collections import defaultdict
+from typing import List
+
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.db.models import RoutineExercise, Exercise, WorkoutSession, SessionSet
+from app.schemas.workout import ExercisePreview, SetTarget
+
+# Next-session targets for a routine, per exercise, from its last completed sessions:
+#   - every target set done at the working weight -> working weight + increment
+#   - otherwise hold the weight, and after PROGRESSION_DELOAD_AFTER_MISSES misses
+#     in a row at that weight, drop it by PROGRESSION_DELOAD_PERCENT
+#   - never done yet -> the routine's week-1 target_weight
+#
+# The result is cached per routine together with a version made of the user's
+# completed-session count (UserWorkoutStats.total_workouts, moved by finishing a
+# session), data version (UserDataVersion.version: targets, exercises) and
+# history version (UserDataVersion.history_version: edits to logged sets). All
+# are read from the DB on every request, so a stale prescription is never
+# served, whichever worker handled the change.
+
+prescription_cache = TTLCache(maxsize=settings.PROGRESSION_CACHE_SIZE, ttl=settings.PROGRESSION_CACHE_TTL_SECONDS)
+
+# One completed session's sets for one exercise: [(weight, reps, is_completed), ...]
+SessionSets = list[tuple[float, int, bool]]
+
+
+def _round_to_increment(weight: float, increment: float) -> float:
+    if increment > 0:
+        return round(round(weight / increment) * increment, 2)
+    return round(weight, 2)
+
+def _succeeded(target: RoutineExercise, sets: SessionSets, working_weight: float) -> bool:
+    done = [
+        reps for weight, reps, is_completed in sets
+        if is_completed and weight >= working_weight and reps >= target.target_reps
+    ]
+    return len(done) >= target.target_sets
+
+def next_weight(target: RoutineExercise, history: list[SessionSets]) -> float:
+    """`history` is newest first and only holds sessions where the exercise was done."""
+    if not history:
+        return target.target_weight
+
+    working_weight = max(weight for weight, _, _ in history[0])
+    if _succeeded(target, history[0], working_weight):
+        return working_weight + target.increment_value
+
+    misses = 0
+    for sets in history:
+        if max(weight for weight, _, _ in sets) != working_weight or _succeeded(target, sets, working_weight):
+            break
+        misses += 1
+
+    if misses >= settings.PROGRESSION_DELOAD_AFTER_MISSES:
+        deloaded = working_weight * (1 - settings.PROGRESSION_DELOAD_PERCENT / 100)
+        return max(0.0, _round_to_increment(deloaded, target.increment_value))
+    return working_weight
+
+
+def compute_prescription(session: Session, user_id: uuid.UUID, routine_id: uuid.UUID) -> List[ExercisePreview]:
+    # 1. Targets + exercise names in one join
+    targets = session.exec(
+        select(RoutineExercise, Exercise.name)
+        .outerjoin(Exercise, RoutineExercise.exercise_id == Exercise.id)
+        .where(RoutineExercise.routine_id == routine_id)
+        .order_by(RoutineExercise.order_index)
+    ).all()
+    if not targets:
+        return []
+
+    # 2. Sets of the routine's last N completed sessions, all exercises at once
+    lookback = max(settings.PROGRESSION_LOOKBACK_SESSIONS, settings.PROGRESSION_DELOAD_AFTER_MISSES)
+    recent = (
+        select(WorkoutSession.id, WorkoutSession.start_time)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.routine_id == routine_id)
+        .where(WorkoutSession.status == "completed")
+        .order_by(WorkoutSession.start_time.desc())
+        .limit(lookback)
+        .subquery()
+    )
+    rows = session.exec(
+        select(recent.c.id, SessionSet.exercise_id, SessionSet.weight, SessionSet.reps, SessionSet.is_completed)
+        .join(SessionSet, SessionSet.session_id == recent.c.id)
+        .order_by(recent.c.start_time.desc(), SessionSet.set_number)
+    ).all()
+
+    # exercise_id -> {session_id: sets}, sessions kept newest first
+    history: dict[uuid.UUID, dict[uuid.UUID, SessionSets]] = defaultdict(dict)
+    for session_id, exercise_id, weight, reps, is_completed in rows:
+        history[exercise_id].setdefault(session_id, []).append((weight, reps, is_completed))
+
+    # 3. Apply the rules in memory
+    prescription = []
+    for rx, exercise_name in targets:
+        weight = next_weight(rx, list(history[rx.exercise_id].values()))
+        prescription.append(ExercisePreview(
+            exercise_id=rx.exercise_id,
+            name=exercise_name or "Unknown",
+            sets=[
+                SetTarget(set_number=i, target_reps=rx.target_reps, target_weight=weight)
+                for i in range(1, rx.target_sets + 1)
+            ],
+            increment_value=rx.increment_value
+        ))
+    return prescription
+
+
+def get_prescription(
+    session: Session, user_id: uuid.UUID, routine_id: uuid.UUID, version: tuple[int, int, int]
+) -> List[ExercisePreview]:
+    """
+    Cached compute_prescription(). `version` is the user's (completed-session count,
+    data version, history version); the caller must already have checked that the
+    routine belongs to the user.
+    """
+    cached = prescription_cache.get(routine_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    prescription = compute_prescription(session, user_id, routine_id)
+    prescription_cache.set(routine_id, (version, prescription))
+    return prescription
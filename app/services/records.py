@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete
+from sqlmodel import Session, select
+
+from app.db.models import PersonalRecord, SessionSet, WorkoutSession
+from app.db.sql import dialect_insert
+from app.services.stats import to_utc_naive
+
+# (exercise_id, weight, reps, achieved_at)
+SetMark = tuple[uuid.UUID, float, int, datetime]
+
+METRICS = {
+    # metric column: (columns that move with it, date column)
+    "max_weight": (("max_weight_reps",), "max_weight_at"),
+    "best_e1rm": (("best_e1rm_brzycki",), "best_e1rm_at"),
+    "best_set_volume": ((), "best_set_volume_at"),
+}
+
+
+def epley(weight: float, reps: int) -> float:
+    if reps <= 0:
+        return 0.0
+    return weight if reps == 1 else weight * (1 + reps / 30)
+
+def epley_sql(weight, reps):
+    # Same as epley(), as a SQL expression over columns
+    return case((reps <= 0, 0.0), (reps == 1, weight), else_=weight * (1 + reps / 30.0))
+
+def brzycki(weight: float, reps: int) -> float:
+    if reps <= 0:
+        return 0.0
+    # The formula breaks down past ~36 reps
+    return weight if reps == 1 else weight * 36 / (37 - min(reps, 36))
+
+
+def best_marks(sets: Iterable[SetMark]) -> dict[uuid.UUID, dict]:
+    """Best weight / e1RM / set volume per exercise, with the date each was hit."""
+    best: dict[uuid.UUID, dict] = {}
+    for exercise_id, weight, reps, achieved_at in sets:
+        marks = {
+            "max_weight": weight, "max_weight_reps": reps,
+            "best_e1rm": epley(weight, reps), "best_e1rm_brzycki": brzycki(weight, reps),
+            "best_set_volume": weight * reps,
+        }
+        record = best.setdefault(exercise_id, {
+            "exercise_id": exercise_id,
+            **{metric: -1.0 for metric in METRICS},
+        })
+        for metric, (companions, date_column) in METRICS.items():
+            if marks[metric] > record[metric]:
+                record[metric] = marks[metric]
+                record[date_column] = to_utc_naive(achieved_at)
+                for companion in companions:
+                    record[companion] = marks[companion]
+    return best
+
+
+def record_new_sets(session: Session, user_id: uuid.UUID, sets: Iterable[SetMark]):
+    """
+    Raise the user's records with freshly written sets (one upsert statement).
+    Only use it for sets that were *added*; edits can lower a record, see recompute_records.
+    """
+    rows = [{"user_id": user_id, **marks} for marks in best_marks(sets).values()]
+    if not rows:
+        return
+
+    statement = dialect_insert(session, PersonalRecord).values(rows)
+    update = {}
+    for metric, (companions, date_column) in METRICS.items():
+        # Each metric (and its reps/date) only moves if the new value beats the stored one
+        is_better = getattr(statement.excluded, metric) > getattr(PersonalRecord, metric)
+        for column in (metric, date_column, *companions):
+            update[column] = case(
+                (is_better, getattr(statement.excluded, column)),
+                else_=getattr(PersonalRecord, column),
+            )
+    session.execute(statement.on_conflict_do_update(
+        index_elements=["user_id", "exercise_id"], set_=update
+    ))
+
+
+def recompute_records(session: Session, user_id: uuid.UUID, exercise_ids: Optional[Iterable[uuid.UUID]] = None):
+    """
+    Rebuild records from history for some exercises (or all of them).
+    Needed after edits, which can lower a best; only reads the affected exercises' sets.
+    """
+    statement = (
+        select(SessionSet.exercise_id, SessionSet.weight, SessionSet.reps, WorkoutSession.start_time)
+        .join(WorkoutSession, SessionSet.session_id == WorkoutSession.id)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .where(SessionSet.is_completed == True)
+    )
+    clear = delete(PersonalRecord).where(PersonalRecord.user_id == user_id)
+    if exercise_ids is not None:
+        exercise_ids = list(exercise_ids)
+        if not exercise_ids:
+            return
+        statement = statement.where(SessionSet.exercise_id.in_(exercise_ids))
+        clear = clear.where(PersonalRecord.exercise_id.in_(exercise_ids))
+
+    rows = session.exec(statement).all()
+    session.execute(clear)
+    for marks in best_marks(rows).values():
+        session.add(PersonalRecord(user_id=user_id, **marks))
+    session.flush()
@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime, date, timezone
+from typing import Optional
+
+from sqlalchemy import case, delete, func, and_
+from sqlmodel import Session, select
+
+from app.db.models import WorkoutSession, UserWorkoutStats, UserMonthlyWorkoutStats
+from app.db.sql import dialect_insert, date_bucket
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    # Clients may send offsets; aggregates are kept in naive UTC like the rest of the DB
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def month_of(value: datetime) -> date:
+    value = to_utc_naive(value)
+    return date(value.year, value.month, 1)
+
+
+def record_completed_session(session: Session, user_id: uuid.UUID, start_time: datetime, end_time: Optional[datetime]):
+    """
+    Count one more completed session. Call it inside the transaction that
+    writes the session, so the totals commit (or roll back) with it.
+    """
+    end_time = to_utc_naive(end_time) if end_time else None
+
+    totals = dialect_insert(session, UserWorkoutStats).values(
+        user_id=user_id, total_workouts=1, last_workout_date=end_time
+    )
+    current, new = UserWorkoutStats.last_workout_date, totals.excluded.last_workout_date
+    session.execute(totals.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "total_workouts": UserWorkoutStats.total_workouts + 1,
+            # max() that ignores NULLs on both backends
+            "last_workout_date": case(
+                (current.is_(None), new),
+                (new.is_(None), current),
+                (new > current, new),
+                else_=current,
+            ),
+        },
+    ))
+
+    monthly = dialect_insert(session, UserMonthlyWorkoutStats).values(
+        user_id=user_id, month=month_of(start_time), workouts=1
+    )
+    session.execute(monthly.on_conflict_do_update(
+        index_elements=["user_id", "month"],
+        set_={"workouts": UserMonthlyWorkoutStats.workouts + 1},
+    ))
+
+
+def get_user_stats(session: Session, user_id: uuid.UUID, month: date) -> tuple[int, int, Optional[datetime]]:
+    # Both tables are read by primary key in one round trip
+    row = session.exec(
+        select(
+            UserWorkoutStats.total_workouts,
+            UserWorkoutStats.last_workout_date,
+            UserMonthlyWorkoutStats.workouts,
+        )
+        .outerjoin(UserMonthlyWorkoutStats, and_(
+            UserMonthlyWorkoutStats.user_id == UserWorkoutStats.user_id,
+            UserMonthlyWorkoutStats.month == month,
+        ))
+        .where(UserWorkoutStats.user_id == user_id)
+    ).first()
+
+    if row is None:
+        return 0, 0, None
+    total, last_workout_date, month_count = row
+    return total, month_count or 0, last_workout_date
+
+
+def rebuild_user_stats(session: Session, user_id: Optional[uuid.UUID] = None):
+    """
+    Recompute the aggregates from workoutsession (for one user, or everyone).
+    Used for backfill and to repair drift; does not commit.
+    """
+    clear_totals = delete(UserWorkoutStats)
+    clear_monthly = delete(UserMonthlyWorkoutStats)
+    month = date_bucket(session, WorkoutSession.start_time, "month")
+    totals = (
+        select(WorkoutSession.user_id, func.count(WorkoutSession.id), func.max(WorkoutSession.end_time))
+        .where(WorkoutSession.status == "completed")
+        .group_by(WorkoutSession.user_id)
+    )
+    monthly = (
+        select(WorkoutSession.user_id, month, func.count(WorkoutSession.id))
+        .where(WorkoutSession.status == "completed")
+        .group_by(WorkoutSession.user_id, month)
+    )
+    if user_id:
+        clear_totals = clear_totals.where(UserWorkoutStats.user_id == user_id)
+        clear_monthly = clear_monthly.where(UserMonthlyWorkoutStats.user_id == user_id)
+        totals = totals.where(WorkoutSession.user_id == user_id)
+        monthly = monthly.where(WorkoutSession.user_id == user_id)
+
+    session.execute(clear_totals)
+    session.execute(clear_monthly)
+
+    for row_user_id, total, last_workout_date in session.exec(totals).all():
+        session.add(UserWorkoutStats(user_id=row_user_id, total_workouts=total, last_workout_date=last_workout_date))
+    for row_user_id, month_start, count in session.exec(monthly).all():
+        session.add(UserMonthlyWorkoutStats(user_id=row_user_id, month=month_start, workouts=count))
+
+    session.flush()
@@ -0,0 +1,110 @@
+import base64
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, or_
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.db.models import (
+    DeletedRecord, Exercise, WorkoutPlan, WorkoutRoutine, RoutineExercise, WorkoutSession, SessionSet
+)
+
+# Delta sync for offline-first clients:
+#   - every synced table has an updated_at (set on insert, bumped on update)
+#   - deletes leave a DeletedRecord tombstone (record_deletion, same transaction)
+#   - the token is the server time the previous sync started at; the next one
+#     sends rows changed since then, minus SYNC_CLOCK_SKEW_SECONDS of overlap
+#     (a re-sent row is harmless, clients upsert by id)
+
+
+def encode_sync_token(synced_at: datetime) -> str:
+    return base64.urlsafe_b64encode(f"v1|{synced_at.isoformat()}".encode()).decode()
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        version, synced_at = base64.urlsafe_b64decode(token.encode()).decode().split("|")
+        if version != "v1":
+            raise ValueError(version)
+        return datetime.fromisoformat(synced_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def record_deletion(session: Session, user_id: uuid.UUID, model, record_ids: Iterable[uuid.UUID]):
+    """Leave tombstones for rows of `model` being deleted in this transaction."""
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "table_name": model.__tablename__, "record_id": record_id, "deleted_at": now}
+        for record_id in record_ids
+    ]
+    if not rows:
+        return
+    session.execute(insert(DeletedRecord), rows)
+    # Housekeeping: drop this user's expired tombstones (indexed range)
+    session.execute(
+        delete(DeletedRecord)
+        .where(DeletedRecord.user_id == user_id)
+        .where(DeletedRecord.deleted_at < now - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS))
+    )
+
+
+def _synced_tables(user_id: uuid.UUID) -> list[tuple[str, type, object]]:
+    # (response key, model, statement scoped to the user; children through their parents)
+    return [
+        ("exercises", Exercise, select(Exercise).where(or_(Exercise.user_id == None, Exercise.user_id == user_id))),
+        ("plans", WorkoutPlan, select(WorkoutPlan).where(WorkoutPlan.user_id == user_id)),
+        ("routines", WorkoutRoutine, (
+            select(WorkoutRoutine)
+            .join(WorkoutPlan)
+            .where(WorkoutPlan.user_id == user_id)
+        )),
+        ("routine_exercises", RoutineExercise, (
+            select(RoutineExercise)
+            .join(WorkoutRoutine, RoutineExercise.routine_id == WorkoutRoutine.id)
+            .join(WorkoutPlan)
+            .where(WorkoutPlan.user_id == user_id)
+        )),
+        ("sessions", WorkoutSession, select(WorkoutSession).where(WorkoutSession.user_id == user_id)),
+        ("sets", SessionSet, (
+            select(SessionSet)
+            .join(WorkoutSession, SessionSet.session_id == WorkoutSession.id)
+            .where(WorkoutSession.user_id == user_id)
+        )),
+    ]
+
+def get_changes(session: Session, user_id: uuid.UUID, token: Optional[str]) -> dict:
+    """Rows changed/deleted since `token` (everything when there is none), plus the next token."""
+    synced_at = datetime.utcnow() # Taken before reading, so nothing falls between two syncs
+
+    since = None
+    if token:
+        since = decode_sync_token(token) - timedelta(seconds=settings.SYNC_CLOCK_SKEW_SECONDS)
+        if since < synced_at - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS):
+            since = None # Tombstones may already be purged: start over
+
+    changes = {}
+    for name, model, statement in _synced_tables(user_id):
+        if since is not None:
+            statement = statement.where(model.updated_at >= since)
+        changes[name] = session.exec(statement).all()
+
+    deleted = []
+    if since is not None:
+        deleted = session.exec(
+            select(DeletedRecord.table_name, DeletedRecord.record_id, DeletedRecord.deleted_at)
+            .where(DeletedRecord.user_id == user_id)
+            .where(DeletedRecord.deleted_at >= since)
+        ).all()
+
+    return {
+        "token": encode_sync_token(synced_at),
+        "full": since is None,
+        **changes,
+        "deleted": [
+            {"table": table_name, "id": record_id, "deleted_at": deleted_at}
+            for table_name, record_id, deleted_at in deleted
+        ],
+    }
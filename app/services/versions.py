@@ -0,0 +1,30 @@
+import uuid
+
+from sqlmodel import Session, select
+
+from app.db.models import UserDataVersion
+from app.db.sql import dialect_insert
+
+
+def data_version_statement(user_id: uuid.UUID):
+    # No row yet means version 0
+    return select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+
+def get_data_version(session: Session, user_id: uuid.UUID) -> int:
+    return session.exec(data_version_statement(user_id)).first() or 0
+
+def bump_data_version(session: Session, user_id: uuid.UUID):
+    """Call inside the transaction that changes the user's exercises/plans/routines/targets."""
+    statement = dialect_insert(session, UserDataVersion).values(user_id=user_id, version=1)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"version": UserDataVersion.version + 1},
+    ))
+
+def bump_history_version(session: Session, user_id: uuid.UUID):
+    """Call inside the transaction that edits the user's logged sessions."""
+    statement = dialect_insert(session, UserDataVersion).values(user_id=user_id, version=0, history_version=1)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"history_version": UserDataVersion.history_version + 1},
+    ))
@@ -0,0 +1,204 @@
+"""
+Runs every read query the routers issue through EXPLAIN and fails if any of
+them does a sequential scan.
+
+It seeds a synthetic dataset (many users, each with plans, routines and a long
+workout history) the first time it runs, so the planner sees realistic table
+sizes. Point DATABASE_URL at a scratch database, not production:
+
+    DATABASE_URL=postgresql://... python check_query_plans.py
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import Request, Response
+from sqlalchemy import event, insert, text
+from sqlmodel import Session, SQLModel, select
+
+from app.db.database import engine, create_db_and_tables
+from app.db.models import User, Exercise, WorkoutPlan, WorkoutRoutine, RoutineExercise, WorkoutSession, SessionSet
+from app.routers import exercises, history, plans, workouts
+from app.services.catalog import invalidate_system_catalog
+
+SEED_EMAIL_DOMAIN = "explain.gym.local"
+
+
+def seed(session: Session, users: int, sessions_per_user: int, sets_per_session: int):
+    if session.exec(select(User).where(User.email == f"user0@{SEED_EMAIL_DOMAIN}")).first():
+        print("   Dataset already seeded, skipping.")
+        return
+
+    print(f"🌱 Seeding {users} users x {sessions_per_user} sessions x {sets_per_session} sets...")
+    system_exercises = [
+        {"id": uuid.uuid4(), "name": f"System Exercise {i}", "is_custom": False, "user_id": None}
+        for i in range(50)
+    ]
+    session.execute(insert(Exercise), system_exercises)
+    now = datetime.utcnow()
+
+    for u in range(users):
+        user_id = uuid.uuid4()
+        session.execute(insert(User), [{
+            "id": user_id, "email": f"user{u}@{SEED_EMAIL_DOMAIN}", "hashed_password": "x",
+            "is_active": True, "created_at": now,
+        }])
+        custom = [
+            {"id": uuid.uuid4(), "name": f"Custom {u}-{i}", "is_custom": True, "user_id": user_id}
+            for i in range(5)
+        ]
+        session.execute(insert(Exercise), custom)
+        exercise_ids = [e["id"] for e in system_exercises[:10] + custom]
+
+        plan_rows, routine_rows, target_rows = [], [], []
+        for p in range(3):
+            plan_id = uuid.uuid4()
+            start = now - timedelta(weeks=8 * (p + 1))
+            plan_rows.append({
+                "id": plan_id, "name": f"Plan {p}", "user_id": user_id, "duration_weeks": 8,
+                "start_date": start, "end_date": start + timedelta(weeks=8),
+                "is_active": p == 0, "created_at": now,
+            })
+            for d in range(4):
+                routine_id = uuid.uuid4()
+                routine_rows.append({
+                    "id": routine_id, "plan_id": plan_id, "name": f"Day {d}",
+                    "day_of_week": d, "routine_type": "workout",
+                })
+                for i, exercise_id in enumerate(random.sample(exercise_ids, 6)):
+                    target_rows.append({
+                        "id": uuid.uuid4(), "routine_id": routine_id, "exercise_id": exercise_id,
+                        "order_index": i + 1, "target_sets": 3, "target_reps": 5,
+                        "target_weight": 60.0, "rest_seconds": 90, "increment_value": 2.5,
+                    })
+        session.execute(insert(WorkoutPlan), plan_rows)
+        session.execute(insert(WorkoutRoutine), routine_rows)
+        session.execute(insert(RoutineExercise), target_rows)
+
+        session_rows, set_rows = [], []
+        for s in range(sessions_per_user):
+            session_id = uuid.uuid4()
+            start = now - timedelta(days=s, hours=random.randint(0, 12))
+            session_rows.append({
+                "id": session_id, "routine_id": random.choice(routine_rows)["id"], "user_id": user_id,
+                "start_time": start, "end_time": start + timedelta(hours=1),
+                "status": "completed" if s % 10 else "skipped",
+            })
+            for n in range(sets_per_session):
+                set_rows.append({
+                    "id": uuid.uuid4(), "session_id": session_id,
+                    "exercise_id": exercise_ids[n % len(exercise_ids)], "set_number": n + 1,
+                    "reps": 5, "weight": 60.0 + n, "is_completed": True,
+                })
+        session.execute(insert(WorkoutSession), session_rows)
+        session.execute(insert(SessionSet), set_rows)
+        session.commit()
+
+    print("   Done.")
+
+
+def capture_router_queries(session: Session) -> list[tuple[str, object]]:
+    """Calls the read endpoints directly and records the SELECTs they send."""
+    user = session.exec(select(User).where(User.email == f"user0@{SEED_EMAIL_DOMAIN}")).one()
+    plan = session.exec(select(WorkoutPlan).where(WorkoutPlan.user_id == user.id)).first()
+    routine = session.exec(select(WorkoutRoutine).where(WorkoutRoutine.plan_id == plan.id)).first()
+    workout = session.exec(select(WorkoutSession).where(WorkoutSession.user_id == user.id)).first()
+    now = datetime.utcnow()
+
+    no_headers = Request({"type": "http", "path": "/", "query_string": b"", "headers": []}) # No If-None-Match: full responses
+    invalidate_system_catalog() # Capture the system catalog query too
+    captured = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    calls = [
+        lambda: exercises.read_exercises(request=no_headers, session=session, current_user=user),
+        lambda: history.get_history(
+            start_date=now - timedelta(days=365), end_date=now, request=no_headers, response=Response(),
+            limit=100, cursor=None, session=session, current_user=user,
+        ),
+        lambda: history.get_stats(session=session, current_user=user),
+        lambda: history.get_session_details(session_id=workout.id, session=session, current_user=user),
+        lambda: plans.get_plans(session=session, current_user=user),
+        lambda: plans.get_plan_details(
+            plan_id=plan.id, request=no_headers, response=Response(), session=session, current_user=user,
+        ),
+        lambda: workouts.get_routines(session=session, current_user=user),
+        lambda: workouts.start_workout_session(routine_id=routine.id, session=session, current_user=user),
+    ]
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        for call in calls:
+            session.expunge_all() # Force real queries instead of identity-map hits
+            call()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+def find_seq_scans(connection, statement: str, parameters) -> list[str]:
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans, stack = [], [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(node.get("Relation Name", "?"))
+            stack.extend(node.get("Plans", []))
+        return scans
+
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        # Only real tables count; "SCAN anon_1" is a pass over a small materialized subquery
+        return [
+            row[-1] for row in rows
+            if row[-1].startswith("SCAN ") and "USING" not in row[-1]
+            and row[-1].split()[1] in SQLModel.metadata.tables
+        ]
+
+    raise SystemExit(f"Unsupported database: {connection.dialect.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=300, help="sessions per user")
+    parser.add_argument("--sets", type=int, default=12, help="sets per session")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        seed(session, args.users, args.sessions, args.sets)
+
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        connection.commit()
+
+    with Session(engine) as session:
+        queries = capture_router_queries(session)
+
+    failures = 0
+    with engine.connect() as connection:
+        for statement, parameters in queries:
+            scans = find_seq_scans(connection, statement, parameters)
+            first_line = " ".join(statement.split())[:100]
+            if scans:
+                failures += 1
+                print(f"❌ {first_line}...\n   sequential scan on: {', '.join(scans)}")
+            else:
+                print(f"✅ {first_line}...")
+
+    print(f"\n{len(queries)} queries checked, {failures} with sequential scans.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
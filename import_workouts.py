@@ -0,0 +1,55 @@
+"""
+Bulk-imports a training log (the /history/export format, NDJSON or CSV)
+into a user's account, without going through the API. Same code path as
+POST /history/import; prints progress after every chunk.
+
+    python import_workouts.py --email test@gym.com training-log.ndjson
+    python import_workouts.py --email test@gym.com old-app.csv --format csv
+"""
+import argparse
+import time
+
+from sqlmodel import Session, select
+
+from app.db.database import engine, create_db_and_tables
+from app.db.models import User
+from app.schemas.export import ImportReport
+from app.services.importer import parse_csv, parse_ndjson, import_sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension")
+    args = parser.parse_args()
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    create_db_and_tables()
+    with Session(engine) as session, open(args.path, encoding="utf-8-sig", newline="") as lines:
+        user = session.exec(select(User).where(User.email == args.email)).first()
+        if not user:
+            raise SystemExit(f"No user with email {args.email}")
+
+        started = time.perf_counter()
+
+        def on_progress(report: ImportReport):
+            elapsed = time.perf_counter() - started
+            print(f"   {report.sessions_imported} sessions, {report.sets_imported} sets "
+                  f"({report.sessions_imported / elapsed:.0f} sessions/s), {report.error_count} errors")
+
+        print(f"📥 Importing {args.path} for {user.email}...")
+        parsed = parse_csv(lines) if file_format == "csv" else parse_ndjson(lines)
+        report = import_sessions(session, user.id, parsed, on_progress=on_progress)
+
+    print(f"✅ Imported {report.sessions_imported} sessions / {report.sets_imported} sets "
+          f"in {time.perf_counter() - started:.1f}s")
+    print(f"   Skipped (already there): {report.sessions_skipped}, new exercises: {report.exercises_created}")
+    if report.error_count:
+        print(f"⚠️  {report.error_count} rows rejected:")
+        for error in report.errors:
+            print(f"   line {error.line}: {error.error}")
+
+
+if __name__ == "__main__":
+    main()
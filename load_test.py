@@ -0,0 +1,84 @@
+"""
+Simple HTTP load test for the read endpoints.
+
+Logs in once, then keeps N concurrent clients hitting the given paths for a
+fixed duration and prints requests/sec and latency percentiles. Run it once
+against a server started normally and once with DB_ASYNC=true to compare:
+
+    uvicorn app.main:app --workers 1            # sync baseline
+    DB_ASYNC=true uvicorn app.main:app --workers 1
+    python load_test.py --concurrency 500 --duration 30
+
+Needs httpx (in the dev dependency group); it is not an app dependency.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+try:
+    import httpx
+except ImportError:
+    raise SystemExit("load_test.py needs httpx: pip install httpx")
+
+DEFAULT_PATHS = ["/workouts/routines", "/exercises/", "/plans/"]
+
+
+async def worker(client: httpx.AsyncClient, paths: list[str], deadline: float, latencies: list, errors: list):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        token_response = await client.post("/token", data={"username": args.email, "password": args.password})
+        token_response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {token_response.json()['access_token']}"
+
+        latencies, errors = [], []
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, args.paths, deadline, latencies, errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    print(f"Target:      {args.url} {', '.join(args.paths)}")
+    print(f"Concurrency: {args.concurrency} clients for {elapsed:.1f}s")
+    print(f"Requests:    {len(latencies)} ok, {len(errors)} failed")
+    print(f"Throughput:  {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        q = statistics.quantiles(latencies, n=100)
+        print(f"Latency:     p50 {q[49] * 1000:.0f}ms  p95 {q[94] * 1000:.0f}ms  p99 {q[98] * 1000:.0f}ms")
+    if errors:
+        print(f"Errors:      {sorted(set(map(str, errors)))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", default="test@gym.com") # Created by seed_db.py
+    parser.add_argument("--password", default="123")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
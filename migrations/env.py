@@ -0,0 +1,48 @@
+"""
+Alembic environment.
+
+Tables are still created by create_db_and_tables() on startup, so a fresh
+database already matches the models. Migrations exist to bring *existing*
+databases (e.g. production) up to date: new indexes, new columns, etc.
+They use if_not_exists where possible so they are safe on both.
+
+Run with: alembic upgrade head
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlmodel import SQLModel
+
+from app.config import settings
+from app.db import models  # noqa: F401  (registers the tables on SQLModel.metadata)
+from app.db.database import engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = SQLModel.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,59 @@
+"""composite indexes for per-user hot queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COMPLETED_ONLY = sa.text("status = 'completed'")
+
+
+def upgrade():
+    op.create_index("ix_exercise_user_id", "exercise", ["user_id"], if_not_exists=True)
+    op.create_index("ix_workoutplan_user_id_is_active", "workoutplan", ["user_id", "is_active"], if_not_exists=True)
+    op.create_index("ix_workoutroutine_plan_id", "workoutroutine", ["plan_id"], if_not_exists=True)
+    op.create_index(
+        "ix_routineexercise_routine_id_order_index", "routineexercise", ["routine_id", "order_index"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_workoutsession_user_id_start_time", "workoutsession", ["user_id", "start_time", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_workoutsession_completed_user_id_start_time", "workoutsession", ["user_id", "start_time"],
+        postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY, if_not_exists=True,
+    )
+    op.create_index(
+        "ix_workoutsession_completed_user_id_end_time", "workoutsession", ["user_id", "end_time"],
+        postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY, if_not_exists=True,
+    )
+    op.create_index(
+        "ix_workoutsession_completed_user_id_routine_id", "workoutsession", ["user_id", "routine_id", "end_time"],
+        postgresql_where=COMPLETED_ONLY, sqlite_where=COMPLETED_ONLY, if_not_exists=True,
+    )
+    op.create_index("ix_workoutsession_routine_id", "workoutsession", ["routine_id"], if_not_exists=True)
+    op.create_index(
+        "ix_sessionset_session_id_exercise_id_set_number", "sessionset", ["session_id", "exercise_id", "set_number"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_sessionset_session_id_exercise_id_set_number", table_name="sessionset")
+    op.drop_index("ix_workoutsession_routine_id", table_name="workoutsession")
+    op.drop_index("ix_workoutsession_completed_user_id_routine_id", table_name="workoutsession")
+    op.drop_index("ix_workoutsession_completed_user_id_end_time", table_name="workoutsession")
+    op.drop_index("ix_workoutsession_completed_user_id_start_time", table_name="workoutsession")
+    op.drop_index("ix_workoutsession_user_id_start_time", table_name="workoutsession")
+    op.drop_index("ix_routineexercise_routine_id_order_index", table_name="routineexercise")
+    op.drop_index("ix_workoutroutine_plan_id", table_name="workoutroutine")
+    op.drop_index("ix_workoutplan_user_id_is_active", table_name="workoutplan")
+    op.drop_index("ix_exercise_user_id", table_name="exercise")
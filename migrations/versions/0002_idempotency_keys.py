@@ -0,0 +1,32 @@
+"""idempotency keys for workout writes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotencykey",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(length=255), primary_key=True),
+        sa.Column("endpoint", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("request_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("response_body", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("idempotencykey")
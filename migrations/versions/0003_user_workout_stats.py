@@ -0,0 +1,56 @@
+"""per-user workout stats aggregates
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "userworkoutstats",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("total_workouts", sa.Integer(), nullable=False),
+        sa.Column("last_workout_date", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "usermonthlyworkoutstats",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("workouts", sa.Integer(), nullable=False),
+        if_not_exists=True,
+    )
+
+    # Backfill from existing sessions. Plain SQL, frozen here: the app's
+    # rebuild_user_stats() may change with later models, this must not.
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        month = "CAST(date_trunc('month', start_time) AS DATE)"
+    else:
+        month = "date(start_time, 'start of month')"
+
+    op.execute("DELETE FROM usermonthlyworkoutstats")
+    op.execute("DELETE FROM userworkoutstats")
+    op.execute(
+        "INSERT INTO userworkoutstats (user_id, total_workouts, last_workout_date) "
+        "SELECT user_id, COUNT(id), MAX(end_time) FROM workoutsession "
+        "WHERE status = 'completed' GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO usermonthlyworkoutstats (user_id, month, workouts) "
+        f"SELECT user_id, {month}, COUNT(id) FROM workoutsession "
+        f"WHERE status = 'completed' GROUP BY user_id, {month}"
+    )
+
+
+def downgrade():
+    op.drop_table("usermonthlyworkoutstats")
+    op.drop_table("userworkoutstats")
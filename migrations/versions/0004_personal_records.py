@@ -0,0 +1,106 @@
+"""personal records per user and exercise
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "personalrecord",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("exercise_id", sa.Uuid(), sa.ForeignKey("exercise.id"), primary_key=True),
+        sa.Column("max_weight", sa.Float(), nullable=False),
+        sa.Column("max_weight_reps", sa.Integer(), nullable=False),
+        sa.Column("max_weight_at", sa.DateTime(), nullable=True),
+        sa.Column("best_e1rm", sa.Float(), nullable=False),
+        sa.Column("best_e1rm_brzycki", sa.Float(), nullable=False),
+        sa.Column("best_e1rm_at", sa.DateTime(), nullable=True),
+        sa.Column("best_set_volume", sa.Float(), nullable=False),
+        sa.Column("best_set_volume_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+
+    # Backfill from existing history, one user at a time. Table-level Core and
+    # the formulas copied in, frozen here: app/services/records.py may change later.
+    bind = op.get_bind()
+    user_ids = bind.execute(sa.select(sessions.c.user_id).distinct()).scalars().all()
+    for user_id in user_ids:
+        rows = bind.execute(
+            sa.select(sets.c.exercise_id, sets.c.weight, sets.c.reps, sessions.c.start_time)
+            .join(sessions, sets.c.session_id == sessions.c.id)
+            .where(sessions.c.user_id == user_id)
+            .where(sessions.c.status == "completed")
+            .where(sets.c.is_completed == sa.true())
+            .order_by(sessions.c.start_time)
+        ).all()
+        records = _best_marks(rows)
+        if records:
+            op.bulk_insert(personal_record, [{"user_id": user_id, **marks} for marks in records.values()])
+
+
+# Snapshot of the tables as they are at this revision
+sessions = sa.table(
+    "workoutsession",
+    sa.column("id", sa.Uuid()), sa.column("user_id", sa.Uuid()),
+    sa.column("status", sa.String()), sa.column("start_time", sa.DateTime()),
+)
+sets = sa.table(
+    "sessionset",
+    sa.column("session_id", sa.Uuid()), sa.column("exercise_id", sa.Uuid()),
+    sa.column("weight", sa.Float()), sa.column("reps", sa.Integer()), sa.column("is_completed", sa.Boolean()),
+)
+personal_record = sa.table(
+    "personalrecord",
+    sa.column("user_id", sa.Uuid()), sa.column("exercise_id", sa.Uuid()),
+    sa.column("max_weight", sa.Float()), sa.column("max_weight_reps", sa.Integer()),
+    sa.column("max_weight_at", sa.DateTime()),
+    sa.column("best_e1rm", sa.Float()), sa.column("best_e1rm_brzycki", sa.Float()),
+    sa.column("best_e1rm_at", sa.DateTime()),
+    sa.column("best_set_volume", sa.Float()), sa.column("best_set_volume_at", sa.DateTime()),
+)
+
+def _epley(weight, reps):
+    if reps <= 0:
+        return 0.0
+    return weight if reps == 1 else weight * (1 + reps / 30)
+
+def _brzycki(weight, reps):
+    if reps <= 0:
+        return 0.0
+    return weight if reps == 1 else weight * 36 / (37 - min(reps, 36))
+
+def _best_marks(rows):
+    # metric: (columns that move with it, date column)
+    metrics = {
+        "max_weight": (("max_weight_reps",), "max_weight_at"),
+        "best_e1rm": (("best_e1rm_brzycki",), "best_e1rm_at"),
+        "best_set_volume": ((), "best_set_volume_at"),
+    }
+    best = {}
+    for exercise_id, weight, reps, achieved_at in rows:
+        marks = {
+            "max_weight": weight, "max_weight_reps": reps,
+            "best_e1rm": _epley(weight, reps), "best_e1rm_brzycki": _brzycki(weight, reps),
+            "best_set_volume": weight * reps,
+        }
+        record = best.setdefault(exercise_id, {"exercise_id": exercise_id, **{m: -1.0 for m in metrics}})
+        for metric, (companions, date_column) in metrics.items():
+            if marks[metric] > record[metric]:
+                record[metric] = marks[metric]
+                record[date_column] = achieved_at
+                for companion in companions:
+                    record[companion] = marks[companion]
+    return best
+
+
+def downgrade():
+    op.drop_table("personalrecord")
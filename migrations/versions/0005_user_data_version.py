@@ -0,0 +1,27 @@
+"""per-user data version for ETags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # No backfill: a missing row reads as version 0
+    op.create_table(
+        "userdataversion",
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("userdataversion")
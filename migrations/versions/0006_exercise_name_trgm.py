@@ -0,0 +1,31 @@
+"""trigram index for exercise search (Postgres only)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Not declared on the model: create_all() also runs on SQLite, which has no
+# pg_trgm. SQLite searches through the in-memory index in app/services/catalog.py.
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_exercise_name_trgm "
+        "ON exercise USING gin (name gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_exercise_name_trgm")
@@ -0,0 +1,60 @@
+"""updated_at columns and deletion tombstones for /sync
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# table -> columns of its (user_id, updated_at) / (updated_at) index
+SYNCED_TABLES = {
+    "exercise": ["user_id", "updated_at"],
+    "workoutplan": ["user_id", "updated_at"],
+    "workoutroutine": ["updated_at"],
+    "routineexercise": ["updated_at"],
+    "workoutsession": ["user_id", "updated_at"],
+    "sessionset": ["updated_at"],
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, index_columns in SYNCED_TABLES.items():
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        if "updated_at" not in columns:
+            # Existing rows count as changed now: the first sync after the upgrade sends them once
+            op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+            if op.get_bind().dialect.name == "postgresql":
+                op.alter_column(table, "updated_at", nullable=False)
+        index_name = f"ix_{table}_{'_'.join(index_columns)}"
+        op.create_index(index_name, table, index_columns, if_not_exists=True)
+
+    op.create_table(
+        "deletedrecord",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("table_name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("record_id", sa.Uuid(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_deletedrecord_user_id_deleted_at", "deletedrecord", ["user_id", "deleted_at"], if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_deletedrecord_user_id_deleted_at", table_name="deletedrecord")
+    op.drop_table("deletedrecord")
+    for table, index_columns in reversed(SYNCED_TABLES.items()):
+        op.drop_index(f"ix_{table}_{'_'.join(index_columns)}", table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("updated_at")
@@ -0,0 +1,27 @@
+"""history version for caches derived from logged sessions
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("userdataversion")}
+    if "history_version" not in columns:
+        op.add_column(
+            "userdataversion",
+            sa.Column("history_version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("userdataversion") as batch:
+        batch.drop_column("history_version")
@@ -0,0 +1,39 @@
+"""
+Recomputes the per-user workout aggregates (userworkoutstats /
+usermonthlyworkoutstats) from the sessions table. Run it once after
+deploying the aggregates, or whenever they need repairing.
+
+    python rebuild_stats.py                    # everyone
+    python rebuild_stats.py --email test@gym.com
+"""
+import argparse
+
+from sqlmodel import Session, select
+
+from app.db.database import engine, create_db_and_tables
+from app.db.models import User
+from app.services.stats import rebuild_user_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", help="only rebuild this user")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        user_id = None
+        if args.email:
+            user = session.exec(select(User).where(User.email == args.email)).first()
+            if not user:
+                raise SystemExit(f"No user with email {args.email}")
+            user_id = user.id
+
+        print("📊 Rebuilding workout stats...")
+        rebuild_user_stats(session, user_id)
+        session.commit()
+        print("   Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time; give the app what it needs before any test imports it
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.db.models import User
+
+
+@pytest.fixture
+def engine():
+    # One shared in-memory connection per test, so several Sessions see the same data
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def user(session) -> User:
+    user = User(email="lifter@test.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Process-wide caches would otherwise carry values from one test's database into the next
+    from app.core.security import user_cache
+    from app.services.calendar import calendar_cache
+    from app.services.catalog import system_catalog_cache
+    from app.services.progression import prescription_cache
+
+    for cache in (user_cache, calendar_cache, system_catalog_cache, prescription_cache):
+        cache.clear()
+    yield
@@ -0,0 +1,40 @@
+"""The dashboard's week and the training calendar must agree on which days a plan schedules."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db.models import WorkoutPlan, WorkoutRoutine
+from app.routers.dashboard import build_dashboard
+from app.services.calendar import build_calendar
+
+
+def add_plan(session, user, start: datetime, weeks: int) -> WorkoutPlan:
+    # Same dates as create_plan: the plan runs over [start, start + weeks)
+    plan = WorkoutPlan(name="Plan", user_id=user.id, duration_weeks=weeks, start_date=start, end_date=start + timedelta(weeks=weeks))
+    session.add(plan)
+    for day_of_week, name in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
+        session.add(WorkoutRoutine(plan_id=plan.id, name=name, day_of_week=day_of_week))
+    session.commit()
+    return plan
+
+def dashboard_days(session, user, today: date) -> list[date]:
+    return sorted(r.scheduled_for for r in build_dashboard(session, user.id, today).this_week)
+
+def calendar_days(session, user, today: date) -> list[date]:
+    week_start = today - timedelta(days=today.weekday())
+    calendar = build_calendar(session, user.id, week_start, week_start + timedelta(days=6))
+    return sorted(e.date for e in calendar.entries if e.scheduled)
+
+
+@pytest.mark.parametrize("plan_start", [datetime(2026, 9, 28), datetime(2026, 9, 30, 18)]) # Monday / mid-week
+@pytest.mark.parametrize("today", [date(2026, 9, 29), date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 14)])
+def test_dashboard_and_calendar_agree_at_the_plan_boundaries(session, user, plan_start, today):
+    add_plan(session, user, plan_start, weeks=2)
+
+    assert dashboard_days(session, user, today) == calendar_days(session, user, today)
+
+def test_plan_end_date_is_exclusive(session, user):
+    add_plan(session, user, datetime(2026, 9, 28), weeks=2) # Ends 2026-10-12
+
+    assert dashboard_days(session, user, date(2026, 10, 12)) == []
+    assert dashboard_days(session, user, date(2026, 10, 11))[-1] == date(2026, 10, 11)
@@ -0,0 +1,81 @@
+"""Idempotency-Key handling on POST /workouts/finish."""
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select, func
+
+from app.db.models import IdempotencyKey, WorkoutPlan, WorkoutRoutine, WorkoutSession, Exercise
+from app.routers import workouts
+from app.schemas.session import SessionCreate
+
+
+@pytest.fixture
+def routine(session, user) -> WorkoutRoutine:
+    plan = WorkoutPlan(name="Plan", user_id=user.id, start_date=datetime(2026, 1, 5), end_date=datetime(2026, 2, 2))
+    routine = WorkoutRoutine(plan_id=plan.id, name="Day A", day_of_week=0)
+    session.add(plan)
+    session.add(routine)
+    session.commit()
+    return routine
+
+@pytest.fixture
+def exercise(session, user) -> Exercise:
+    exercise = Exercise(name="Squat", user_id=user.id)
+    session.add(exercise)
+    session.commit()
+    return exercise
+
+
+def payload(routine, exercise, reps: int = 5) -> SessionCreate:
+    return SessionCreate(
+        routine_id=routine.id,
+        start_time=datetime(2026, 1, 5, 9),
+        end_time=datetime(2026, 1, 5, 10),
+        sets=[{"exercise_id": exercise.id, "set_number": 1, "reps": reps, "weight": 100.0, "is_completed": True}],
+    )
+
+def finish(session, user, body: SessionCreate, key: str):
+    return workouts.finish_workout(session_data=body, idempotency_key=key, db=session, current_user=user)
+
+def session_count(session: Session) -> int:
+    return session.exec(select(func.count()).select_from(WorkoutSession)).one()
+
+
+def test_replay_returns_the_original_response(session, user, routine, exercise):
+    first = finish(session, user, payload(routine, exercise), key="retry-1")
+    replay = finish(session, user, payload(routine, exercise), key="retry-1")
+
+    assert replay.id == first.id
+    assert session_count(session) == 1
+
+def test_same_key_with_a_different_body_is_rejected(session, user, routine, exercise):
+    finish(session, user, payload(routine, exercise, reps=5), key="retry-2")
+
+    with pytest.raises(HTTPException) as error:
+        finish(session, user, payload(routine, exercise, reps=6), key="retry-2")
+
+    assert error.value.status_code == 422
+    assert session_count(session) == 1
+
+def test_concurrent_insert_of_the_same_key_returns_the_stored_row(engine, session, user, routine, exercise, monkeypatch):
+    # The "other request": it checked first, found nothing, and committed its write
+    with Session(engine) as other:
+        winner = finish(other, user, payload(routine, exercise), key="race")
+
+    # This request also checked before the winner committed, so its first lookup sees nothing
+    real_lookup = workouts.get_stored_response
+    lookups = []
+
+    def lookup_before_commit(*args, **kwargs):
+        lookups.append(args)
+        return None if len(lookups) == 1 else real_lookup(*args, **kwargs)
+
+    monkeypatch.setattr(workouts, "get_stored_response", lookup_before_commit)
+    loser = finish(session, user, payload(routine, exercise), key="race")
+
+    # Its commit hit the (user_id, key) primary key, rolled back and re-read the stored row
+    assert loser.id == winner.id
+    assert len(lookups) == 2
+    assert session_count(session) == 1
+    assert session.get(IdempotencyKey, (user.id, "race")) is not None
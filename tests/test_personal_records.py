@@ -0,0 +1,97 @@
+"""Personal records: the upsert on new sets and the recompute after edits."""
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.db.models import Exercise, PersonalRecord, WorkoutPlan, WorkoutRoutine
+from app.routers import history, workouts
+from app.schemas.session import SessionCreate, SessionUpdate
+from app.services.records import epley, record_new_sets
+
+
+@pytest.fixture
+def exercise(session, user) -> Exercise:
+    exercise = Exercise(name="Bench", user_id=user.id)
+    session.add(exercise)
+    session.commit()
+    return exercise
+
+@pytest.fixture
+def routine(session, user) -> WorkoutRoutine:
+    plan = WorkoutPlan(name="Plan", user_id=user.id, start_date=datetime(2026, 1, 5), end_date=datetime(2026, 2, 2))
+    routine = WorkoutRoutine(plan_id=plan.id, name="Day A", day_of_week=0)
+    session.add(plan)
+    session.add(routine)
+    session.commit()
+    return routine
+
+
+def record_for(session: Session, user, exercise) -> PersonalRecord:
+    session.expire_all() # Upserts bypass the identity map
+    return session.get(PersonalRecord, (user.id, exercise.id))
+
+def sets(exercise, *marks):
+    return [
+        {"exercise_id": exercise.id, "set_number": i, "reps": reps, "weight": weight, "is_completed": True}
+        for i, (weight, reps) in enumerate(marks, start=1)
+    ]
+
+def finish(session, user, routine, day: int, set_list) -> str:
+    body = SessionCreate(
+        routine_id=routine.id, start_time=datetime(2026, 1, day, 9), end_time=datetime(2026, 1, day, 10), sets=set_list,
+    )
+    return workouts.finish_workout(session_data=body, idempotency_key=None, db=session, current_user=user).id
+
+def edit(session, user, session_id, set_list):
+    history.update_session(
+        session_id=session_id, update_data=SessionUpdate(sets=set_list),
+        idempotency_key=None, session=session, current_user=user,
+    )
+
+
+def test_upsert_keeps_the_best_on_a_later_lower_set(session, user, exercise):
+    record_new_sets(session, user.id, [(exercise.id, 100.0, 5, datetime(2026, 1, 5))])
+    record_new_sets(session, user.id, [(exercise.id, 90.0, 5, datetime(2026, 1, 12))])
+    session.commit()
+
+    record = record_for(session, user, exercise)
+    assert (record.max_weight, record.max_weight_reps, record.max_weight_at) == (100.0, 5, datetime(2026, 1, 5))
+    assert record.best_e1rm == pytest.approx(epley(100.0, 5))
+    assert record.best_set_volume == 500.0
+
+def test_upsert_moves_each_metric_independently(session, user, exercise):
+    record_new_sets(session, user.id, [(exercise.id, 100.0, 1, datetime(2026, 1, 5))])
+    record_new_sets(session, user.id, [(exercise.id, 80.0, 10, datetime(2026, 1, 12))]) # Lighter, but more volume
+    session.commit()
+
+    record = record_for(session, user, exercise)
+    assert (record.max_weight, record.max_weight_at) == (100.0, datetime(2026, 1, 5))
+    assert (record.best_set_volume, record.best_set_volume_at) == (800.0, datetime(2026, 1, 12))
+
+def test_recompute_after_a_set_is_edited_down(session, user, routine, exercise):
+    finish(session, user, routine, 5, sets(exercise, (100.0, 5)))
+    best = finish(session, user, routine, 12, sets(exercise, (120.0, 5)))
+    assert record_for(session, user, exercise).max_weight == 120.0
+
+    edit(session, user, best, sets(exercise, (110.0, 5)))
+
+    record = record_for(session, user, exercise)
+    assert (record.max_weight, record.max_weight_at) == (110.0, datetime(2026, 1, 12, 9))
+    assert record.best_set_volume == 550.0
+
+def test_recompute_after_the_best_set_is_deleted(session, user, routine, exercise):
+    finish(session, user, routine, 5, sets(exercise, (100.0, 5)))
+    best = finish(session, user, routine, 12, sets(exercise, (90.0, 3), (120.0, 5)))
+
+    edit(session, user, best, sets(exercise, (90.0, 3))) # Set 2 removed
+
+    record = record_for(session, user, exercise)
+    assert (record.max_weight, record.max_weight_at) == (100.0, datetime(2026, 1, 5, 9))
+
+def test_recompute_drops_the_record_when_no_sets_are_left(session, user, routine, exercise):
+    only = finish(session, user, routine, 5, sets(exercise, (100.0, 5)))
+
+    edit(session, user, only, [])
+
+    assert record_for(session, user, exercise) is None
@@ -0,0 +1,60 @@
+"""GET /plans/{plan_id} must cost the same number of queries whatever the plan size."""
+from datetime import datetime, timedelta
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.db.models import User, Exercise, WorkoutPlan, WorkoutRoutine, RoutineExercise
+from app.routers.plans import get_plan_details
+
+
+def build_plan(session: Session, user: User, routines: int, targets: int) -> WorkoutPlan:
+    start = datetime(2026, 1, 5)
+    plan = WorkoutPlan(name=f"{routines}x{targets}", user_id=user.id, start_date=start, end_date=start + timedelta(weeks=4))
+    session.add(plan)
+    for r in range(routines):
+        routine = WorkoutRoutine(plan_id=plan.id, name=f"Day {r}", day_of_week=r)
+        session.add(routine)
+        for t in range(targets):
+            exercise = Exercise(name=f"Lift {r}.{t}", user_id=user.id)
+            session.add(exercise)
+            session.add(RoutineExercise(
+                routine_id=routine.id, exercise_id=exercise.id, order_index=t,
+                target_sets=3, target_reps=5, target_weight=60.0, increment_value=2.5,
+            ))
+    session.commit()
+    return plan
+
+
+def count_statements(engine, session: Session, call) -> int:
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    session.expunge_all() # Force real queries instead of identity-map hits
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return len(statements)
+
+
+def test_plan_details_query_count_is_constant(engine, session, user):
+    small = build_plan(session, user, routines=1, targets=1)
+    large = build_plan(session, user, routines=6, targets=8)
+    small_id, large_id = small.id, large.id
+
+    def details(plan_id):
+        request = Request({"type": "http", "headers": []}) # No If-None-Match: full response
+        return get_plan_details(plan_id=plan_id, request=request, response=Response(), session=session, current_user=user)
+
+    details(small_id) # Warm per-process caches so they don't skew the first count
+
+    small_count = count_statements(engine, session, lambda: details(small_id))
+    large_count = count_statements(engine, session, lambda: details(large_id))
+
+    assert len(details(large_id).routines) == 6
+    assert small_count == large_count
@@ -0,0 +1,140 @@
+"""Progression rules (next_weight) and the versioned prescription cache behind /workouts/start."""
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.db.models import Exercise, RoutineExercise, WorkoutPlan, WorkoutRoutine
+from app.routers import exercises, history, workouts
+from app.schemas.exercise import ExerciseUpdate
+from app.schemas.session import SessionCreate, SessionUpdate
+from app.services import progression
+from app.services.versions import get_data_version
+
+
+def target(**overrides) -> RoutineExercise:
+    values = dict(
+        routine_id=None, exercise_id=None, order_index=1,
+        target_sets=3, target_reps=5, target_weight=60.0, increment_value=2.5,
+    )
+    return RoutineExercise(**{**values, **overrides})
+
+def session_sets(weight: float, *reps: int, completed: bool = True):
+    return [(weight, r, completed) for r in reps]
+
+
+# --- Rules ---
+
+def test_no_history_uses_the_plan_weight():
+    assert progression.next_weight(target(target_weight=60.0), []) == 60.0
+
+def test_success_adds_the_increment():
+    history = [session_sets(100.0, 5, 5, 5)]
+    assert progression.next_weight(target(), history) == 102.5
+
+def test_success_counts_only_completed_sets_at_the_working_weight():
+    history = [session_sets(100.0, 5, 5) + session_sets(100.0, 5, completed=False)]
+    assert progression.next_weight(target(), history) == 100.0
+
+def test_a_miss_holds_the_weight():
+    history = [session_sets(102.5, 5, 5, 4), session_sets(100.0, 5, 5, 5)]
+    assert progression.next_weight(target(), history) == 102.5
+
+def test_repeated_misses_deload():
+    misses = settings.PROGRESSION_DELOAD_AFTER_MISSES
+    history = [session_sets(100.0, 5, 4, 4)] * misses
+    expected = round(100.0 * (1 - settings.PROGRESSION_DELOAD_PERCENT / 100) / 2.5) * 2.5
+    assert progression.next_weight(target(), history) == expected
+
+def test_misses_at_an_older_weight_do_not_count_towards_a_deload():
+    misses = settings.PROGRESSION_DELOAD_AFTER_MISSES
+    history = [session_sets(102.5, 5, 4, 4)] * (misses - 1) + [session_sets(100.0, 5, 4, 4)]
+    assert progression.next_weight(target(), history) == 102.5
+
+
+# --- Cached prescription ---
+
+@pytest.fixture
+def squat(session, user) -> Exercise:
+    exercise = Exercise(name="Squat", user_id=user.id)
+    session.add(exercise)
+    session.commit()
+    return exercise
+
+@pytest.fixture
+def routine(session, user, squat) -> WorkoutRoutine:
+    plan = WorkoutPlan(name="Plan", user_id=user.id, start_date=datetime(2026, 1, 5), end_date=datetime(2026, 2, 2))
+    routine = WorkoutRoutine(plan_id=plan.id, name="Day A", day_of_week=0)
+    session.add(plan)
+    session.add(routine)
+    session.add(target(routine_id=routine.id, exercise_id=squat.id, target_weight=100.0))
+    session.commit()
+    return routine
+
+
+def start(session, user, routine):
+    session.expire_all()
+    return workouts.start_workout_session(routine_id=routine.id, session=session, current_user=user).exercises[0]
+
+def finish(session, user, routine, exercise, day: int, *reps: int, weight: float = 100.0):
+    body = SessionCreate(
+        routine_id=routine.id, start_time=datetime(2026, 1, day, 9), end_time=datetime(2026, 1, day, 10),
+        sets=[
+            {"exercise_id": exercise.id, "set_number": i, "reps": r, "weight": weight, "is_completed": True}
+            for i, r in enumerate(reps, start=1)
+        ],
+    )
+    return workouts.finish_workout(session_data=body, idempotency_key=None, db=session, current_user=user).id
+
+@pytest.fixture
+def computed(monkeypatch):
+    # Counts real (uncached) computations
+    calls = []
+    real = progression.compute_prescription
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(progression, "compute_prescription", counting)
+    return calls
+
+
+def test_prescription_is_cached_until_a_session_is_finished(session, user, routine, squat, computed):
+    assert start(session, user, routine).sets[0].target_weight == 100.0
+    assert start(session, user, routine).sets[0].target_weight == 100.0
+    assert len(computed) == 1
+
+    finish(session, user, routine, squat, 5, 5, 5, 5)
+
+    assert start(session, user, routine).sets[0].target_weight == 102.5
+    assert len(computed) == 2
+
+def test_editing_a_logged_session_reversions_the_prescription(session, user, routine, squat, computed):
+    logged = finish(session, user, routine, squat, 5, 5, 5, 5)
+    assert start(session, user, routine).sets[0].target_weight == 102.5
+    data_version = get_data_version(session, user.id)
+
+    # Versioned in the DB, not invalidated in-process: any worker sees the edit
+    history.update_session(
+        session_id=logged,
+        update_data=SessionUpdate(sets=[
+            {"exercise_id": squat.id, "set_number": i, "reps": r, "weight": 100.0, "is_completed": True}
+            for i, r in enumerate((5, 5, 3), start=1)
+        ]),
+        idempotency_key=None, session=session, current_user=user,
+    )
+
+    assert start(session, user, routine).sets[0].target_weight == 100.0
+    assert len(computed) == 2
+    # Logged sets don't feed the exercises/plan ETags or the calendar
+    assert get_data_version(session, user.id) == data_version
+
+def test_renaming_an_exercise_reversions_the_prescription(session, user, routine, squat):
+    assert start(session, user, routine).name == "Squat"
+
+    exercises.update_exercise(
+        exercise_id=squat.id, exercise_update=ExerciseUpdate(name="Back Squat"), session=session, current_user=user,
+    )
+
+    assert start(session, user, routine).name == "Back Squat"